@@ -5,7 +5,7 @@ from difflib import SequenceMatcher
 from utils.llm import minimum_schema_prompt, extract_json, call_llm
 from product_ideation_agent import (
     get_product_components,
-    load_catalog,
+    product_prompt_blocks,
     AZURE_ENDPOINT,
     AZURE_API_KEY,
     API_VER,
@@ -32,16 +32,8 @@ def call_product_ideation_with_search(
 
     # ── 2) Retrieval + allowed components ──────────────────────────────────
     matches = get_product_components(user_concept)
-    retrieval_block = "### Retrieved Products & Datasheets:\n" + "\n".join(
-        f"- {m['title']}: {m['url']}" for m in matches
-    )
-    catalog = load_catalog()
-    all_comps = []
-    for m in matches:
-        all_comps.extend(catalog[m["title"]]["components"])
-    allowed_block = (
-        "### Allowed Components (use **only** these):\n"
-        + "\n".join(f"- {c}" for c in sorted(set(all_comps)))
+    retrieval_block, allowed_block = product_prompt_blocks(
+        tuple(m["title"] for m in matches)
     )
 
     # ── 2a) Build "avoid" block ─────────────────────────────────────────
@@ -152,6 +152,7 @@ st.markdown(f"""
 
 import streamlit as st
 import sys, inspect, json, time, logging, itertools
+import orjson
 from io import BytesIO
 from typing import List, Dict, Any
 
@@ -160,7 +161,7 @@ import deepdiff  # pip install deepdiff
 import requests
 import os
 from config import WORKFLOWS, DEFAULT_COST_UNIT, DEFAULT_TARGET_COST, MIN_ACCEPTABLE_TRL
-from config import SECTION_DEPENDENCIES
+from config import SECTION_DEPENDENCIES, SECTION_REGEN_RANK, get_downstream
 from agents import AGENTS
 from agents import AGENT_MODEL_MAP, AGENTS
 from schemas import AGENT_JSON_SCHEMAS
@@ -630,6 +631,17 @@ st.markdown("""
 .concept-card-footer > * {
   overflow: visible;
 }
+
+/* fixed page footer (markup is emitted at the end of the script) */
+.app-footer {
+  position: fixed;
+  bottom: 0; left: 0; right: 0;
+  background-color: #F2F2F2;
+  text-align: center;
+  padding: 8px 0;
+  font-size: 0.8rem;
+  color: #666;
+}
 </style>
 """, unsafe_allow_html=True)
 
@@ -1335,15 +1347,17 @@ from typing import Dict, Any
 import asyncio
 
 from utils.llm import call_llm_with_schema_sync
-from utils.trl_assessor import assess_trl_async, load_trl_rubric
+from utils.trl_assessor import assess_trl_async, assess_trl_batch, load_trl_rubric
 from utils.evidence import gather_evidence, sanitize_snippet
 from schemas import AGENT_JSON_SCHEMAS
 from agents import AGENT_MODEL_MAP
 import logging
 logger = logging.getLogger("uvicorn.error")
-def enrich_concept_card(title: str, description: str) -> Dict[str, Any]:
+def enrich_concept_card(title: str, description: str, trl: Any = None) -> Dict[str, Any]:
     """
     Return a concept card enriched by Scientific Research Agent 2 and both initial & validated TRL assessments.
+    Batch callers pass the initial assessment (or its exception) as *trl*,
+    from :func:`_batch_trl`, so it is not run again here.
     """
     # Preserve original concept essence
     card: Dict[str, Any] = {"title": title, "description": description}
@@ -1367,7 +1381,11 @@ def enrich_concept_card(title: str, description: str) -> Dict[str, Any]:
 
     # Initial TRL via async assessor (sync-run)
     try:
-        result, evidence_list = asyncio.run(assess_trl_async(description))
+        if trl is None:
+            trl = asyncio.run(assess_trl_async(description))
+        elif isinstance(trl, BaseException):
+            raise trl
+        result, evidence_list = trl
         card["trl"] = result.get("trl")
         card["trl_reasoning"] = result.get("justification")
         citations = result.get("citations") or []
@@ -1433,6 +1451,12 @@ def enrich_concept_card(title: str, description: str) -> Dict[str, Any]:
 
     return card
 
+
+def _batch_trl(descriptions: List[str]) -> Dict[str, Any]:
+    """Initial TRL for every distinct description at once, for enrich loops."""
+    topics = list(dict.fromkeys(d for d in descriptions if d))
+    return dict(zip(topics, assess_trl_batch(topics, return_exceptions=True)))
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 2. Session defaults
 # ─────────────────────────────────────────────────────────────────────────────
@@ -1458,7 +1482,6 @@ _DEFAULTS = {
     "df_to_process": None,
     # NEW — for the editor
     "_current_title":  "",
-    "_previous_draft": {},
     "flash_sections": [],
     "last_diff": None,
 }
@@ -1483,10 +1506,15 @@ if regen:
     edited = regen["field"]  # e.g. "performance_targets"
 
     # ── Build cascade set (1-hop + second-order ripple) ──────────────────
-    cascade = {edited} | set(SECTION_DEPENDENCIES.get(edited, []))
-    cascade |= set(
-        sec for parent in list(cascade) for sec in SECTION_DEPENDENCIES.get(parent, [])
-    )
+    cascade = set(get_downstream(edited))
+
+    # ── Pre-edit view of the draft: every field edited since the last
+    #    regeneration of this concept is restored to its original value
+    regen_title = regen.get("title", concept.get("title"))
+    pending = st.session_state.get("_pending_diff", {})
+    previous = dict(concept)
+    for key in [k for k in pending if k[0] == regen_title]:
+        previous[key[1]] = pending.pop(key)
 
     # ── Optional “ask-first” UI (falls back on ⏎ enter if st.modal missing)
     # ── Optional “ask-first” UI ───────────────────────────────────────────────
@@ -1509,7 +1537,10 @@ if regen:
         if explicit_owners and ag_name not in explicit_owners:
             continue
 
-        owned = [sec for sec in cascade if sec in agent.schema["properties"]]
+        owned = sorted(
+            (sec for sec in cascade if sec in agent.schema["properties"]),
+            key=lambda sec: SECTION_REGEN_RANK.get(sec, len(SECTION_REGEN_RANK)),
+        )
         if not owned:
             continue  # nothing for this agent to update
 
@@ -1521,7 +1552,7 @@ if regen:
         user_p = json.dumps(
             {
                 "current_draft": concept,
-                "previous_draft": st.session_state.get("_previous_draft", {}),
+                "previous_draft": previous,
                 "section_changed": edited,
             },
             ensure_ascii=False,
@@ -1534,14 +1565,13 @@ if regen:
             # 2) Only apply the keys you explicitly cascaded
             valid_patch = {k: v for k, v in raw_patch.items() if k in cascade}
             concept.update(valid_patch)
-            st.session_state["_previous_draft"] = json.loads(json.dumps(concept))
             st.rerun()
         except Exception as e:
             st.warning(f"{ag_name} failed: {e}")
 
     # ── Sticky-note diff & visual flash list ─────────────────────────────
     diff = deepdiff.DeepDiff(
-        st.session_state.get("_previous_draft", {}),
+        previous,
         concept,
         ignore_order=True,
         view="tree",
@@ -1554,8 +1584,6 @@ if regen:
     st.session_state["flash_sections"] = list(flashed)
 
     st.session_state["last_diff"] = diff.to_json(indent=2) if diff else None
-
-    st.session_state["_previous_draft"] = json.loads(json.dumps(concept))
     st.rerun()
 # ───────────────────────────────────────────────────────────────────────────
 
@@ -1823,6 +1851,9 @@ with st.sidebar:
                 except Exception as e:
                     st.error(f"Failed to parse PPTX: {e}")
                     cards = []
+                trls = _batch_trl([
+                    c.get("description", "").strip() for c in cards if c.get("title", "").strip()
+                ])
                 for card in cards:
                     title = card.get("title", "").strip()
                     desc = card.get("description", "").strip()
@@ -1830,7 +1861,7 @@ with st.sidebar:
                         st.warning(f"Skipping slide without title/description: {card}")
                         continue
                     try:
-                        enriched = enrich_concept_card(title, desc)
+                        enriched = enrich_concept_card(title, desc, trls.get(desc))
                     except Exception as e:
                         st.warning(f"Enrichment failed for '{title}': {e}")
                         continue
@@ -2025,9 +2056,10 @@ if (
 
         if st.button("Enrich & Queue for Export", key="enrich_hist_all"):
             enriched_cards = []
+            trls = _batch_trl([r["description"] for r in combined])
             for r in combined:
                 # run the enrichment
-                card = enrich_concept_card(r["title"], r["description"])
+                card = enrich_concept_card(r["title"], r["description"], trls.get(r["description"]))
                 # stash the original title
                 card["title"] = r["title"]
                 card["original_title"] = r["title"]
@@ -2194,8 +2226,10 @@ if (
                 else:
                     # 2. only enrich the ones the user actually picked
                     enriched_cards = []
-                    for r in selected.to_dict("records"):
-                        card = enrich_concept_card(r["title"], r["description"])
+                    records = selected.to_dict("records")
+                    trls = _batch_trl([r["description"] for r in records])
+                    for r in records:
+                        card = enrich_concept_card(r["title"], r["description"], trls.get(r["description"]))
                         card["original_title"] = r["title"]
                         card["title"] = r["title"]
                         enriched_cards.append(card)
@@ -2315,6 +2349,9 @@ if (
 
         # 1) Grab the master “selected concepts” DataFrame
         sel = st.session_state.get("selected_df", pd.DataFrame()).copy()
+        # drafts dict lives in session_state and is mutated in place by PE.save,
+        # so one lookup per rerun serves the preview, chat and spawn branches
+        drafts = PE._drafts()
 
         # 2) If nothing at all is selected upstream
         if sel.empty:
@@ -2374,7 +2411,7 @@ if (
             # ───────────────────────────────────────────────────────────────
             # 📄 Proposal Draft Preview & Editor
             # ───────────────────────────────────────────────────────────────
-            titles = list(PE._drafts())
+            titles = list(drafts)
             if titles:
                 current = st.session_state.get("_current_title", titles[0])
                 if current not in titles:
@@ -2392,8 +2429,8 @@ if (
             # 💬 Concept-level Chat
             # ───────────────────────────────────────────────────────────────
             st.markdown("### 💬 Concept Chat")
-            chat_choices = sel["title"].tolist()
-            chat_choice = st.selectbox("Select concept to chat about:", chat_choices, key="chat_select")
+            sel_titles = sel["title"].tolist()
+            chat_choice = st.selectbox("Select concept to chat about:", sel_titles, key="chat_select")
             if st.button("Open Chat", key="open_final_chat"):
                 st.session_state.active_chat_concept = chat_choice
 
@@ -2410,7 +2447,6 @@ if (
                         _log("user", user_msg, "User")
 
                         # 2) grab the full proposal draft for this concept
-                        drafts = PE._drafts()
                         full_draft = drafts.get(active, {})
 
                         # 3) directly invoke the LLM for Scientific Research Agent 2
@@ -2421,7 +2457,7 @@ if (
                         system_prompt = (
                             "You are Scientific Research Agent 2.\n\n"
                             "Here is the full proposal draft (all sections):\n\n"
-                            f"{json.dumps(full_draft, indent=2)}\n\n"
+                            f"{orjson.dumps(full_draft).decode()}\n\n"
                             "Please answer the following question as concisely and accurately as possible:"
                         )
                         user_prompt = user_msg
@@ -2447,7 +2483,6 @@ if (
             st.markdown("---")
             if st.button("➕ Spawn Refined Concept from Conversation", key="spawn_refined"):
                 # 1) collect draft + history
-                drafts  = PE._drafts()
                 full    = drafts.get(active, {})
                 history = st.session_state.setdefault(f"_chat_{active}", [])
 
@@ -2457,7 +2492,7 @@ if (
                 ep, dep, ver, key = AGENT_MODEL_MAP["Scientific Research Agent 2"]
                 sys_p = (
                     "You are Scientific Research Agent 2.  You've seen this proposal draft and the follow-up Q&A:\n\n"
-                    f"Draft:\n{json.dumps(full, indent=2)}\n\n"
+                    f"Draft:\n{orjson.dumps(full).decode()}\n\n"
                     "Conversation:\n"
                     + "\n".join(f"{m['role']}: {m['text']}" for m in history)
                     + "\n\nNow produce a single new, fully-formed concept (with title, description, novelty_reasoning, "
@@ -2476,8 +2511,8 @@ if (
                 # 3) normalize to a dict
                 if isinstance(resp, str):
                     try:
-                        parsed = json.loads(resp)
-                    except json.JSONDecodeError:
+                        parsed = orjson.loads(resp)
+                    except orjson.JSONDecodeError:
                         st.error("❌ Could not parse agent response as JSON.")
                         st.stop()
                     sol_obj = parsed
@@ -2500,8 +2535,12 @@ if (
                 new_row["__select__"] = True
                 new_row["id"] = None
 
-                df = st.session_state.solutions_df.copy()
-                st.session_state.solutions_df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
+                # concat already returns a new frame, so no defensive copy of the
+                # (possibly large) solutions_df is needed first
+                st.session_state.solutions_df = pd.concat(
+                    [st.session_state.solutions_df, pd.DataFrame.from_records([new_row])],
+                    ignore_index=True,
+                )
 
                 # re-build selected_df so it shows up immediately
                 st.session_state.selected_df = _aggregate_selected()
@@ -2525,13 +2564,22 @@ if (
             from requests_toolbelt.multipart.encoder import MultipartEncoder
 
             # … inside your “Commit to Blob Storage” button handler …
+            force_rebuild = st.checkbox(
+                "Rebuild proposals that were already committed", key="force_recommit"
+            )
             if st.button("📦 Commit Selected Proposals", key="commit_final"):
                 to_commit = final.copy()
                 if to_commit.empty:
                     st.warning("Select at least one concept before committing.")
                 else:
-                    successes = 0
+                    successes = skipped = 0
                     for idx, rec in to_commit.iterrows():
+                        # 0️⃣  Already uploaded → skip the DOCX build + upload
+                        existing_url = rec.get("proposal_url")
+                        if isinstance(existing_url, str) and existing_url and not force_rebuild:
+                            skipped += 1
+                            continue
+
                         # 1️⃣  Ensure it’s saved in your backend
                         cid = rec.get("id")
                         if cid is None:
@@ -2542,7 +2590,7 @@ if (
                             if not ok:
                                 st.error(f"❌ Failed to save “{rec['title']}” (status={status})")
                                 continue
-                            cid = json.loads(body)[0].get("id")
+                            cid = orjson.loads(body)[0].get("id")
                             st.session_state.selected_df.at[idx, "id"] = cid
 
                         # 2️⃣  Build the one‑concept DOCX in memory
@@ -2575,33 +2623,23 @@ if (
                             continue
 
                         # 5️⃣  On success, grab the returned URL
-                        data = resp.json()
+                        data = orjson.loads(resp.content)
                         url = data.get("proposal_url", "")
                         st.session_state.selected_df.at[idx, "proposal_url"] = url
                         successes += 1
 
                     # 6️⃣  Summarize
+                    if skipped:
+                        st.info(f"Skipped {skipped} proposal(s) that were already committed.")
                     if successes:
                         st.success(f"✅ Committed {successes} proposal(s) to storage.")
-                    else:
+                    elif not skipped:
                         st.warning("No proposals were successfully committed.")
             # ─── 3) Fixed footer ───────────────────────────────────────────────────
-st.markdown(
-    """
-    <style>
-      .app-footer {
-        position: fixed;
-        bottom: 0; left: 0; right: 0;
-        background-color: #F2F2F2;
-        text-align: center;
-        padding: 8px 0;
-        font-size: 0.8rem;
-        color: #666;
-      }
-    </style>
-    <div class="app-footer">
-      Powered by Carlisle Research & Innovation • © 2025 Carlisle Construction Materials
-    </div>
-    """,
-    unsafe_allow_html=True,
+# styled by .app-footer in the global stylesheet above – no second <style>
+# element is rebuilt on every rerun
+FOOTER_HTML = (
+    '<div class="app-footer">Powered by Carlisle Research & Innovation'
+    ' • © 2025 Carlisle Construction Materials</div>'
 )
+st.markdown(FOOTER_HTML, unsafe_allow_html=True)
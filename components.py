@@ -3,10 +3,13 @@
 import os
 import json
 import asyncio
+import orjson
+from functools import lru_cache
 from langdetect import detect, DetectorFactory
 from azure.search.documents import SearchClient
 from azure.core.credentials import AzureKeyCredential
 from utils.llm import call_llm_with_schema_async, call_llm
+from utils.chunking import token_windows
 from schemas import AGENT_JSON_SCHEMAS
 
 # ─── Seed langdetect for consistency ────────────────────────────────────────
@@ -54,6 +57,9 @@ AGENT_JSON_SCHEMAS["Component Extraction"] = {
         {"required": ["raw_materials"]}
     ]
 }
+# static schema → serialise once for the extraction prompt
+_COMPONENT_SCHEMA = AGENT_JSON_SCHEMAS["Component Extraction"]
+_COMPONENT_SCHEMA_JSON = json.dumps(_COMPONENT_SCHEMA, indent=2)
 
 # ─── Azure Search client ─────────────────────────────────────────────────
 search_client = SearchClient(
@@ -63,20 +69,33 @@ search_client = SearchClient(
 )
 
 # ─── Helper: detect English text ──────────────────────────────────────────
-def is_english(text: str) -> bool:
+LANG_SAMPLE_CHARS = 500
+
+@lru_cache(maxsize=None)
+def _detect_english(sample: str) -> bool:
     try:
-        return detect(text[:1000]) == "en"
+        return detect(sample) == "en"
     except:
         return False
 
+def is_english(text: str) -> bool:
+    sample = text[:LANG_SAMPLE_CHARS]
+    if not sample:
+        return False
+    # mostly non-ASCII (CJK, Cyrillic, …) can't be English – skip langdetect
+    ascii_ratio = sum(1 for c in sample if ord(c) < 128) / len(sample)
+    if ascii_ratio < 0.5:
+        return False
+    return _detect_english(sample)
+
 # ─── Call LLM with schema, fallback to JSON parse ─────────────────────────
 async def safe_extract(text: str) -> dict:
-    schema = AGENT_JSON_SCHEMAS["Component Extraction"]
+    schema = _COMPONENT_SCHEMA
     prompt = (
         "You are a product-formulation expert. Below is datasheet text:\n\n"
         f"{text}\n\n"
         "Extract exactly JSON matching this schema, flag inferred items with '(D)':\n"
-        f"{json.dumps(schema, indent=2)}"
+        f"{_COMPONENT_SCHEMA_JSON}"
     )
     # Schema-enforced extraction attempts
     for attempt in range(3):
@@ -109,40 +128,43 @@ async def safe_extract(text: str) -> dict:
         print(f"❌ Fallback parse failed: {e}")
         return {}
 
-# ─── Extract per-PDF with overlapping windows ─────────────────────────────
-async def extract_from_doc(doc: dict) -> dict | None:
+# ─── Extract per-PDF with sentence-aligned token windows ───────────────────
+# Windows end on sentence boundaries, so no overlap is needed to keep items
+# from being cut in half.
+EXTRACT_WINDOW_TOKENS = 1500
+EXTRACT_ENCODING      = "o200k_base"   # gpt-4o / gpt-4.1 tokenizer
+async def extract_from_doc(doc: dict, check_language: bool = True) -> dict | None:
     title   = doc.get("title") or doc.get("id", "<no-title>")
     url     = doc.get("url", "")
     content = doc.get("content", "")
-    if not content or not is_english(content):
+    if not content or (check_language and not is_english(content)):
         return None
 
-    window_size = 2000
-    overlap     = 200
-    comps, forms, raws, prods = [], [], [], []
-    start = 0
-    while start < len(content):
-        window = content[start:start+window_size]
+    # dedupe as we go – the same items recur across windows
+    comps, forms, raws, prods = set(), set(), set(), set()
+    for window in token_windows(content, EXTRACT_WINDOW_TOKENS, encoding=EXTRACT_ENCODING):
         res = await safe_extract(window)
-        prods  += res.get("products", [])
-        comps  += res.get("components", [])
-        forms  += res.get("formulation", [])
-        raws   += res.get("raw_materials", [])
-        start += window_size - overlap
+        prods.update(res.get("products", ()))
+        comps.update(res.get("components", ()))
+        forms.update(res.get("formulation", ()))
+        raws.update(res.get("raw_materials", ()))
 
     return {
         "title":         title,
         "url":           url,
-        "products":      sorted(set(prods)),
-        "components":    sorted(set(comps)),
-        "formulation":   sorted(set(forms)),
-        "raw_materials": sorted(set(raws)),
+        "products":      sorted(prods),
+        "components":    sorted(comps),
+        "formulation":   sorted(forms),
+        "raw_materials": sorted(raws),
     }
 
 # ─── Main: parallel extraction, skip processed & non-English, write results immediately ─
 async def main():
     catalog_file = "complete_component_catalog.json"
-    catalog = json.load(open(catalog_file)) if os.path.exists(catalog_file) else {}
+    catalog = {}
+    if os.path.exists(catalog_file):
+        with open(catalog_file, "rb") as f:
+            catalog = orjson.loads(f.read())
     processed = set(catalog.keys())
     total     = search_client.get_document_count()
     print(f"🔍 Index has {total} chunks; processed {len(processed)} PDFs.")
@@ -174,15 +196,16 @@ async def main():
     async def worker(title, chunks):
         async with sem:
             print(f"⏳ Starting {title}")
+            # language was already checked when scheduling
             entry = await extract_from_doc({
                 "title":   title,
                 "url":      chunks[0].get("url",""),
                 "content":  "".join(c["content"] for c in chunks)
-            })
+            }, check_language=False)
             if entry:
                 catalog[title] = entry
-                with open(catalog_file, "w") as f:
-                    json.dump(catalog, f, indent=2)
+                with open(catalog_file, "wb") as f:
+                    f.write(orjson.dumps(catalog, option=orjson.OPT_INDENT_2))
                 print(f"  ✔️ Done {title}")
 
     tasks = [asyncio.create_task(worker(title, chunks))
@@ -10,6 +10,8 @@ Streamlit's Secrets manager when deploying.
 
 from __future__ import annotations
 import os
+from types import MappingProxyType
+from typing import Mapping
 
 # ===========================================================================
 # 🔐  Endpoints & API keys (read from env)  =================================
@@ -30,6 +32,8 @@ SEARCH_ENDPOINT        = _get("SEARCH_ENDPOINT")
 SEARCH_INDEX           = _get("SEARCH_INDEX")
 SEARCH_KEY             = _get("SEARCH_KEY")
 SERP_API_KEY           = _get("SERP_API_KEY")
+# Optional CA bundle path for TLS-intercepting corporate proxies
+AZURE_CA_BUNDLE        = _get("AZURE_CA_BUNDLE")
 # Fail fast if critical secrets are missing when imported by the main app.
 
 
@@ -199,5 +203,56 @@ SECTION_DEPENDENCIES: dict[str, list[str]] = {
     # title & executive_summary depend on almost everything; handled globally
 }
 
+# Regeneration cascade per section: the section itself, its dependents, and
+# their dependents (two hops).  The graph has cycles (e.g. technical_details
+# ⇄ performance_targets), so a full transitive closure would pull in nearly
+# every section – the two-hop ripple is what the editor regenerates.
+def _ripple(section: str) -> frozenset[str]:
+    first = {section, *SECTION_DEPENDENCIES.get(section, ())}
+    return frozenset(first.union(*(SECTION_DEPENDENCIES.get(s, ()) for s in first)))
+
+
+SECTION_CASCADE: Mapping[str, frozenset[str]] = MappingProxyType(
+    {sec: _ripple(sec) for sec in SECTION_DEPENDENCIES}
+)
+
+
+def get_downstream(section: str) -> frozenset[str]:
+    """Sections to regenerate after *section* is edited (includes itself)."""
+    return SECTION_CASCADE.get(section, frozenset((section,)))
+
+
+# Regeneration order: upstream sections before the ones that depend on them
+# (Kahn's algorithm).  Where the graph loops, the pending section with the
+# fewest unresolved parents is released next (ties → declaration order).
+def _regen_order() -> tuple[str, ...]:
+    nodes = list(dict.fromkeys(
+        [*SECTION_DEPENDENCIES, *(c for deps in SECTION_DEPENDENCIES.values() for c in deps)]
+    ))
+    indeg = dict.fromkeys(nodes, 0)
+    for deps in SECTION_DEPENDENCIES.values():
+        for child in deps:
+            indeg[child] += 1
+
+    order: list[str] = []
+    pending = dict.fromkeys(nodes)          # insertion-ordered set
+    while pending:
+        ready = [n for n in pending if indeg[n] == 0]
+        if not ready:                       # cycle – break it deterministically
+            ready = [min(pending, key=indeg.__getitem__)]
+        for node in ready:
+            del pending[node]
+            order.append(node)
+            for child in SECTION_DEPENDENCIES.get(node, ()):
+                if child in pending:
+                    indeg[child] -= 1
+    return tuple(order)
+
+
+SECTION_REGEN_ORDER: tuple[str, ...] = _regen_order()
+SECTION_REGEN_RANK: Mapping[str, int] = MappingProxyType(
+    {sec: i for i, sec in enumerate(SECTION_REGEN_ORDER)}
+)
+
 
 # End of file
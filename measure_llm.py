@@ -1,5 +1,8 @@
+import asyncio
+import statistics
 import time
-from utils.query_generator import generate_academic_search_query
+# Bypass the memory/disk caches so every run measures real LLM round-trips
+from utils.query_generator import _generate_query
 
 # Paste your longest example text here:
 long_concept = """
@@ -9,10 +12,34 @@ Integrate helium leak-test station inline; defective tiles are picked out before
 Specify modular 12 × 12 in tile pattern so any field cut removes whole tiles cleanly, limiting random breaches (Principle 1).
 """
 
-start = time.time()
-try:
-    short_q = generate_academic_search_query(long_concept, max_keywords=8)
-    took = time.time() - start
-    print(f"LLM helper returned in {took:.1f} seconds:", short_q)
-except Exception as e:
-    print("LLM helper raised:", e)
+N_CALLS = 8  # concurrent requests per run
+
+
+async def _timed_call() -> float:
+    t0 = time.perf_counter()
+    await asyncio.to_thread(_generate_query, long_concept, 8)
+    return time.perf_counter() - t0
+
+
+async def main() -> None:
+    start = time.perf_counter()
+    results = await asyncio.gather(*[_timed_call() for _ in range(N_CALLS)],
+                                   return_exceptions=True)
+    elapsed = time.perf_counter() - start
+
+    errors = [r for r in results if isinstance(r, Exception)]
+    latencies = sorted(r for r in results if not isinstance(r, Exception))
+    for e in errors:
+        print("LLM helper raised:", e)
+    if not latencies:
+        return
+
+    p50 = statistics.median(latencies)
+    p95 = latencies[min(len(latencies) - 1, round(0.95 * (len(latencies) - 1)))]
+    print(f"{len(latencies)}/{N_CALLS} calls ok in {elapsed:.1f}s "
+          f"→ {len(latencies) / elapsed:.2f} req/s")
+    print(f"latency p50={p50:.1f}s  p95={p95:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
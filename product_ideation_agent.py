@@ -1,50 +1,151 @@
 import os
 import json
+import hashlib
+import threading
+import time
+import uuid
 import faiss
+import httpx
 import numpy as np
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from cachetools import TTLCache
+from diskcache import Cache
 from openai import AzureOpenAI
+from config import PRODUCTS_ENDPOINT, PRODUCTS_OPENAI_KEY
 from utils.llm import call_llm  # existing LLM wrapper
+from utils.chunking import token_windows
 
 # ─── Configuration ─────────────────────────────────────────────────────────
 CATALOG_PATH    = "complete_component_catalog.json"
 INDEX_PATH      = "components_chunked.faiss"
 META_PATH       = "components_chunked_meta.json"
 
-# Azure OpenAI settings
-AZURE_ENDPOINT  = "https://ccm-product-agent.openai.azure.com"
-AZURE_API_KEY   = "2Gq04Cva1b41axfHcPMCWPaws9OJw3zk3iHRcrrZ9IFsQFVKvSegJQQJ99BDACYeBjFXJ3w3AAABACOG9c66"
+# Azure OpenAI settings (credentials come from env / secrets via config.py)
+AZURE_ENDPOINT  = PRODUCTS_ENDPOINT or "https://ccm-product-agent.openai.azure.com"
+AZURE_API_KEY   = PRODUCTS_OPENAI_KEY
 API_VER         = "2025-01-01-preview"
 EMBED_MODEL     = "text-embedding-ada-002"
 IDEATION_MODEL  = "gpt-4.1"
 TOP_K           = 5
+EMBED_BATCH     = 64              # chunks per embeddings request (keeps a
+                                  # request well under the per-call token cap)
+CHUNK_TOKENS    = 3000            # cl100k_base tokens per index window
+CHUNK_OVERLAP   = 200
+EMBED_WORKERS   = 8               # concurrent embeddings requests
+EMBED_CACHE_DIR = ".cache/embeddings"
+EMBED_CACHE_TTL = 24 * 3600       # seconds
+
+# HNSW graph parameters (vectors stored as 8-bit scalar codes)
+HNSW_M               = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH       = 64
+
+# Query → results cache for get_product_components
+SEARCH_CACHE_SIZE = 1024
+SEARCH_CACHE_TTL  = 600           # seconds
+
+# Below this many rows, search with a NumPy dot product instead of FAISS
+BRUTE_FORCE_MAX   = 2000
+
+# Semantic cache for ideate_with_products responses
+RESPONSE_CACHE_DIR     = ".cache/ideation_responses"
+RESPONSE_CACHE_TTL     = 7 * 24 * 3600   # seconds
+SEMANTIC_HIT_THRESHOLD = 0.95            # cosine similarity of the briefs
 
 # ─── Azure OpenAI client for embeddings ────────────────────────────────────
-embed_client = AzureOpenAI(
-    azure_endpoint=AZURE_ENDPOINT,
-    api_key=AZURE_API_KEY,
-    api_version=API_VER,
+# One pooled HTTP client, so concurrent embedding batches reuse keep-alive
+# connections instead of paying a TCP+TLS handshake each.
+_http_client = httpx.Client(
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+    timeout=30.0,
 )
 
 
+@lru_cache(maxsize=1)
+def _embed_client() -> AzureOpenAI:
+    """Built on first use – a missing key must not stop the app from booting."""
+    return AzureOpenAI(
+        azure_endpoint=AZURE_ENDPOINT,
+        api_key=AZURE_API_KEY,
+        api_version=API_VER,
+        http_client=_http_client,
+        max_retries=3,
+    )
+
+
+# ─── On-disk embedding cache (survives restarts, so index builds resume) ───
+_embed_cache = Cache(EMBED_CACHE_DIR)
+
+
+def _cache_key(text: str) -> str:
+    return f"{EMBED_MODEL}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+
 def embed_text(text: str) -> list[float]:
-    """Call Azure OpenAI embeddings on a single text chunk."""
-    resp = embed_client.embeddings.create(
+    """Call Azure OpenAI embeddings on a single text chunk (disk-cached)."""
+    key = _cache_key(text)
+    emb = _embed_cache.get(key)
+    if emb is None:
+        resp = _embed_client().embeddings.create(
+            model=EMBED_MODEL,
+            input=text
+        )
+        emb = resp.data[0].embedding
+        _embed_cache.set(key, emb, expire=EMBED_CACHE_TTL)
+    return emb
+
+
+def _embed_batch(texts: list[str]) -> list[list[float]]:
+    resp = _embed_client().embeddings.create(
         model=EMBED_MODEL,
-        input=text
+        input=texts
     )
-    return resp.data[0].embedding
+    # the API may return items out of order – sort on their index
+    return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+
+
+def _iter_embeddings(texts: list[str], batch: int):
+    """Yield ``(i, embedding)`` for every text – disk-cache hits first, then
+    the misses, sent in concurrent batches (the work is pure network wait)."""
+    keys = [_cache_key(t) for t in texts]
+    todo = []
+    for i, k in enumerate(keys):
+        emb = _embed_cache.get(k)
+        if emb is None:
+            todo.append(i)
+        else:
+            yield i, emb
 
+    batches = [todo[i:i + batch] for i in range(0, len(todo), batch)]
+    with ThreadPoolExecutor(max_workers=EMBED_WORKERS) as executor:
+        results = executor.map(lambda idxs: _embed_batch([texts[i] for i in idxs]), batches)
+        for idxs, embs in zip(batches, results):
+            for i, emb in zip(idxs, embs):
+                _embed_cache.set(keys[i], emb, expire=EMBED_CACHE_TTL)
+                yield i, emb
 
+
+@lru_cache(maxsize=1)
 def load_catalog() -> dict:
-    """Load the full extracted catalog from JSON."""
-    with open(CATALOG_PATH, "r") as f:
-        return json.load(f)
+    """Load the full extracted catalog from JSON (parsed once per process).
+
+    Each record also gets a ``_components_set`` frozenset so callers can
+    union components without re-walking the lists.  Treat the result as
+    read-only – it is shared between callers.
+    """
+    with open(CATALOG_PATH, "rb") as f:
+        catalog = orjson.loads(f.read())
+    for rec in catalog.values():
+        rec["_components_set"] = frozenset(rec.get("components", ()))
+    return catalog
 
 
 # ─── Build FAISS index by chunking each PDF into windows ───────────────────
 def build_faiss_index():
     catalog = load_catalog()
-    metas, embs = [], []
+    metas, chunks, owner = [], [], []
 
     for title, rec in catalog.items():
         # flatten all list fields into one long string
@@ -53,20 +154,35 @@ def build_faiss_index():
             items.extend(rec.get(field, []))
         full_text = "  ".join(items)
 
-        # slice into overlapping windows
-        window_size, overlap = 2000, 200
-        start = 0
-        while start < len(full_text):
-            chunk = full_text[start:start + window_size]
-            emb = embed_text(chunk)
-            embs.append(emb)
-            metas.append({"title": title, "url": rec["url"]})
-            start += window_size - overlap
-
-    # build and save index
-    arr = np.array(embs, dtype="float32")
-    index = faiss.IndexFlatIP(arr.shape[1])
+        # slice into overlapping token windows (ada-002 accepts 8191 tokens)
+        windows = list(token_windows(full_text, CHUNK_TOKENS, overlap=CHUNK_OVERLAP))
+        if not windows:
+            continue
+        owner.extend([len(metas)] * len(windows))
+        chunks.extend(windows)
+        metas.append({"title": title, "url": rec["url"]})
+
+    # embed in batches and mean-pool each PDF's windows into a single row as
+    # they arrive, so the index holds one vector per title (no dedupe
+    # over-fetch) and only the (titles × d) block is ever resident
+    arr = None
+    for i, emb in _iter_embeddings(chunks, EMBED_BATCH):
+        v = np.asarray(emb, dtype=np.float32)
+        if arr is None:
+            arr = np.zeros((len(metas), v.shape[0]), dtype=np.float32)
+        arr[owner[i]] += v / (np.linalg.norm(v) or 1.0)   # every window weighs the same
+
+    # build and save index – row i lines up with metas[i]
+    faiss.normalize_L2(arr)              # unit vectors → inner product == cosine
+    # HNSW graph (logarithmic search) over 8-bit scalar-quantised vectors
+    # (4× smaller than float32, so the scan and read_index move 4× fewer bytes)
+    index = faiss.IndexHNSWSQ(
+        arr.shape[1], faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT
+    )
+    index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    index.train(arr)                     # learns per-dimension value ranges
     index.add(arr)
+    index.hnsw.efSearch = HNSW_EF_SEARCH
     faiss.write_index(index, INDEX_PATH)
     with open(META_PATH, "w") as f:
         json.dump(metas, f, indent=2)
@@ -77,55 +193,171 @@ def build_faiss_index():
 def load_faiss_index():
     """Load an existing FAISS index and its metas."""
     index = faiss.read_index(INDEX_PATH)
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = HNSW_EF_SEARCH   # not persisted with the index
     metas = json.load(open(META_PATH))
     return index, metas
 
 
 # ─── Retrieve top-K unique PDFs for a query ────────────────────────────────
+_search_cache: TTLCache = TTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+_search_lock = threading.RLock()
+
+
 def get_product_components(query: str, top_k: int = TOP_K) -> list[dict]:
-    if not os.path.exists(INDEX_PATH):
-        index, metas = build_faiss_index()
+    """Top-K unique datasheets for *query*; repeat queries hit a TTL cache."""
+    key = (" ".join(query.lower().split()), top_k)
+    with _search_lock:
+        hit = _search_cache.get(key)
+    if hit is None:
+        hit = _search_components(query, top_k)
+        with _search_lock:
+            _search_cache[key] = hit
+    return list(hit)
+
+
+def _clear_search_cache() -> None:
+    with _search_lock:
+        _search_cache.clear()
+
+
+# call after the catalog / index is rebuilt
+get_product_components.clear_cache = _clear_search_cache
+
+
+# ─── Index is loaded (or built) once and kept for the process lifetime ─────
+_INDEX: tuple | None = None   # (index, metas, titles, one_row_per_title, dense|None)
+_INDEX_LOCK = threading.Lock()
+
+
+def _get_index() -> tuple:
+    global _INDEX
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            if os.path.exists(INDEX_PATH):
+                index, metas = load_faiss_index()
+            else:
+                index, metas = build_faiss_index()
+            titles = np.array([m["title"] for m in metas])
+            pooled = len(np.unique(titles)) == len(titles)
+            # small catalogs: a plain matrix-vector product beats the ANN call
+            dense = None
+            if index.ntotal < BRUTE_FORCE_MAX:
+                dense = index.reconstruct_n(0, index.ntotal)
+                faiss.normalize_L2(dense)
+            _INDEX = (index, metas, titles, pooled, dense)
+        return _INDEX
+
+
+def invalidate_index() -> None:
+    """Drop the in-memory index (and cached searches) after a catalog update."""
+    global _INDEX
+    with _INDEX_LOCK:
+        _INDEX = None
+    _clear_search_cache()
+    load_catalog.cache_clear()
+    product_prompt_blocks.cache_clear()
+
+
+def _search_components(query: str, top_k: int) -> list[dict]:
+    index, metas, titles, pooled, dense = _get_index()
+
+    q_emb = np.asarray([embed_text(query)], dtype="float32")
+    faiss.normalize_L2(q_emb)
+    # pooled indexes hold one row per title; older per-window indexes need
+    # an over-fetch so enough distinct titles survive the dedupe below
+    fetch = top_k if pooled else top_k * 5
+    if dense is not None:
+        scores = dense @ q_emb[0]
+        fetch = min(fetch, len(scores))
+        top = np.argpartition(-scores, fetch - 1)[:fetch]
+        order = top[np.argsort(-scores[top])]
     else:
-        index, metas = load_faiss_index()
+        _, I = index.search(q_emb, fetch)
+        order = I[0][I[0] >= 0]      # drop padding when fewer hits than asked
+    if not pooled:
+        # keep the best-ranked row of each title, in rank order
+        _, first = np.unique(titles[order], return_index=True)
+        order = order[np.sort(first)]
+
+    return [metas[i] for i in order[:top_k]]
+
+
+@lru_cache(maxsize=256)
+def product_prompt_blocks(titles: tuple[str, ...]) -> tuple[str, str]:
+    """Return ``(retrieval_block, allowed_block)`` for the matched *titles*.
+
+    Repeat briefs usually retrieve the same datasheets, so the joined
+    strings are cached per match set.
+    """
+    catalog = load_catalog()
+    retrieval_block = "### Retrieved Products & Datasheets:\n" + "\n".join(
+        f"- {t}: {catalog[t]['url']}" for t in titles
+    )
+    unique_comps = sorted(frozenset().union(
+        *(catalog[t]["_components_set"] for t in titles)
+    ))
+    allowed_block = (
+        "### Allowed Components (use **only** these):\n"
+        + "\n".join(f"- {c}" for c in unique_comps)
+    )
+    return retrieval_block, allowed_block
 
-    q_emb = np.array([embed_text(query)], dtype="float32")
-    _, I = index.search(q_emb, top_k * 5)  # over-fetch to dedupe
 
-    seen, results = set(), []
-    for idx in I[0]:
-        meta = metas[idx]
-        t = meta["title"]
-        if t not in seen:
-            seen.add(t)
-            results.append(meta)
-            if len(results) >= top_k:
-                break
+# ─── Semantic response cache for ideate_with_products ──────────────────────
+# Entries are (unit prompt vector, scope, answer, timestamp); *scope* hashes
+# the existing-concept titles so a hit never ignores a different avoid-list.
+# Persisted in diskcache (which expires them) and mirrored in memory.
+_response_store = Cache(RESPONSE_CACHE_DIR)
+_responses: list[tuple] | None = None
+_responses_lock = threading.Lock()
 
-    return results
+
+def _live_responses() -> list[tuple]:
+    global _responses
+    if _responses is None:
+        _responses = [v for v in map(_response_store.get, list(_response_store)) if v is not None]
+    cutoff = time.time() - RESPONSE_CACHE_TTL
+    _responses = [e for e in _responses if e[3] >= cutoff]
+    return _responses
+
+
+def _semantic_get(q_vec: np.ndarray, scope: str) -> str | None:
+    with _responses_lock:
+        candidates = [e for e in _live_responses() if e[1] == scope]
+    if not candidates:
+        return None
+    sims = np.stack([e[0] for e in candidates]) @ q_vec
+    best = int(np.argmax(sims))
+    return candidates[best][2] if sims[best] >= SEMANTIC_HIT_THRESHOLD else None
+
+
+def _semantic_put(q_vec: np.ndarray, scope: str, answer: str) -> None:
+    entry = (q_vec, scope, answer, time.time())
+    with _responses_lock:
+        _live_responses().append(entry)
+    _response_store.set(uuid.uuid4().hex, entry, expire=RESPONSE_CACHE_TTL)
 
 
 # ─── Ideation using your existing call_llm ────────────────────────────────
 def ideate_with_products(user_prompt: str, existing_concepts: list[dict]) -> str:
-    # 1) Get top-K relevant PDFs
-    matches = get_product_components(user_prompt)
     # 1a) build set of existing titles for deduping
     existing_titles = {c.get("title", "").lower() for c in existing_concepts}
 
-    # 2) Build retrieval block
-    retrieval_block = "### Retrieved Products & Datasheets:\n" + "\n".join(
-        f"- {m['title']}: {m['url']}" for m in matches
-    )
+    # 0) Near-duplicate brief with the same concepts to avoid → reuse answer
+    q_vec = np.asarray(embed_text(user_prompt), dtype=np.float32)
+    q_vec /= np.linalg.norm(q_vec) or 1.0
+    scope = hashlib.sha256("\n".join(sorted(existing_titles)).encode("utf-8")).hexdigest()
+    cached = _semantic_get(q_vec, scope)
+    if cached is not None:
+        return cached
 
-    # 3) Load full catalog once, then gather allowed components
-    catalog = load_catalog()
-    all_comps = []
-    for m in matches:
-        all_comps.extend(catalog[m["title"]]["components"])
-    unique_comps = sorted(set(all_comps))
+    # 1) Get top-K relevant PDFs
+    matches = get_product_components(user_prompt)
 
-    allowed_block = (
-        "### Allowed Components (use **only** these):\n"
-        + "\n".join(f"- {c}" for c in unique_comps)
+    # 2-3) Retrieval + allowed-components blocks (memoised per match set)
+    retrieval_block, allowed_block = product_prompt_blocks(
+        tuple(m["title"] for m in matches)
     )
     # 3a) Tell the LLM which EXISTING concepts to avoid
     avoid_block = ""
@@ -148,7 +380,7 @@ def ideate_with_products(user_prompt: str, existing_concepts: list[dict]) -> str
     sections.append(f"### Original Brief:\n{user_prompt}")
     full_user = "\n\n".join(sections)
 
-    return call_llm(
+    answer = call_llm(
         AZURE_ENDPOINT,
         IDEATION_MODEL,
         API_VER,
@@ -156,6 +388,9 @@ def ideate_with_products(user_prompt: str, existing_concepts: list[dict]) -> str
         full_user,
         api_key=AZURE_API_KEY
     )
+    if not answer.startswith("Error"):
+        _semantic_put(q_vec, scope, answer)
+    return answer
 
 
 # ─── CLI demo ───────────────────────────────────────────────────────────────
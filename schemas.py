@@ -6,8 +6,8 @@ from __future__ import annotations
 """Centralised JSON Schemas for all agents + proposal writer.
 
 You can import `SCHEMA_PW` and `AGENT_JSON_SCHEMAS` anywhere in the project,
-then validate with `jsonschema.validate()` or use the pre‑built
-`PROPOSAL_VALIDATOR` object.
+then validate with the pre‑built `PROPOSAL_VALIDATOR` object or
+`get_validator(schema)`, which compiles each distinct schema only once.
 """
 
 # ===========================================================================
@@ -415,6 +415,24 @@ AGENT_JSON_SCHEMAS["TRL Assessment"] = {
 # 3. Validator helper
 # ===========================================================================
 from jsonschema import Draft7Validator
+import json
+from jsonschema.validators import validator_for
 PROPOSAL_VALIDATOR = Draft7Validator(SCHEMA_PW)
 
+# Compiled validators, keyed by canonical schema JSON so equal schemas share
+# one.  `jsonschema.validate()` re-checks the schema against the meta-schema
+# and rebuilds a validator on every call; this does it once per schema.
+_VALIDATORS: dict = {}
+
+
+def get_validator(schema: dict):
+    """Return the compiled validator for *schema*, building it on first use."""
+    key = json.dumps(schema, sort_keys=True)
+    validator = _VALIDATORS.get(key)
+    if validator is None:
+        cls = validator_for(schema)
+        cls.check_schema(schema)
+        validator = _VALIDATORS[key] = cls(schema)
+    return validator
+
 # End of file
@@ -0,0 +1,70 @@
+"""Token-aware text splitting for LLM / embedding windows."""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Iterator, List
+
+import tiktoken
+
+# Natural break points: sentence ends, line breaks, and the double-space
+# separators used when catalog lists are flattened into one string.
+_BOUNDARY = re.compile(r"(?<=[.!?;])\s+|\n+|\s{2,}")
+
+
+@lru_cache(maxsize=None)
+def _encoder(encoding: str) -> tiktoken.Encoding:
+    return tiktoken.get_encoding(encoding)
+
+
+def token_windows(
+    text: str,
+    max_tokens: int,
+    *,
+    encoding: str = "cl100k_base",
+    overlap: int = 0,
+) -> Iterator[str]:
+    """Yield windows of *text* holding at most *max_tokens* tokens each.
+
+    Windows are packed greedily from whole sentences; a single sentence
+    longer than *max_tokens* is hard-split on token boundaries.  With
+    *overlap* > 0, trailing sentences worth up to that many tokens are
+    repeated at the start of the next window.
+    """
+    enc = _encoder(encoding)
+    pieces = [p for p in _BOUNDARY.split(text) if p and p.strip()]
+    if not pieces:
+        return
+
+    window: List[str] = []
+    sizes: List[int] = []
+    used = 0
+    for piece, toks in zip(pieces, enc.encode_ordinary_batch(pieces)):
+        n = len(toks)
+        if n > max_tokens:
+            if window:
+                yield " ".join(window)
+                window, sizes, used = [], [], 0
+            step = max(max_tokens - overlap, 1)
+            for i in range(0, n, step):
+                yield enc.decode(toks[i:i + max_tokens])
+            continue
+
+        if used + n > max_tokens and window:
+            yield " ".join(window)
+            # carry the tail of the previous window forward as overlap
+            keep, kept = 0, 0
+            budget = min(overlap, max_tokens - n)
+            while keep < len(sizes) and kept + sizes[-1 - keep] <= budget:
+                kept += sizes[-1 - keep]
+                keep += 1
+            window = window[len(window) - keep:] if keep else []
+            sizes = sizes[len(sizes) - keep:] if keep else []
+            used = kept
+
+        window.append(piece)
+        sizes.append(n)
+        used += n
+
+    if window:
+        yield " ".join(window)
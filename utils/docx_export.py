@@ -27,15 +27,16 @@ docx_export.build_docx_report(refined_concepts, buf,
 
 from __future__ import annotations
 
-import re, time, json
+import re, time, asyncio, hashlib, copy
+import orjson
 from io import BytesIO
+from xml.sax.saxutils import escape
 from typing import List, Dict, Any, Callable
 
-from docx import Document
-from docx.shared import Pt, Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from utils.trl_assessor import assess_trl
 import logging
+
+# python-docx / lxml and the TRL + agent stack are imported where used, so
+# importing this module for SECTION_ORDER or _as_list stays cheap.
 # PUBLIC EXPORT
 __all__ = ["build_docx_report"]
 
@@ -43,18 +44,99 @@ __all__ = ["build_docx_report"]
 # Helper – snake-to-words list normaliser
 # ---------------------------------------------------------------------------
 
+_SPLIT_RE = re.compile(r"(?:\n+|•|;)+")
+_BULLET_CHARS = " •;-"
+
+
 def _as_list(v: Any) -> List[str]:
+    if isinstance(v, (list, tuple)):          # hot path – most LLM fields
+        return [str(x) for x in v]
     if v is None:
         return []
     if isinstance(v, str):
-        parts = [p.strip(" •;-") for p in re.split(r"(?:\n+|•|;)+", v) if p.strip()]
+        parts = [p.strip(_BULLET_CHARS) for p in _SPLIT_RE.split(v) if p.strip()]
         return parts or [v]
-    if isinstance(v, (list, tuple)):
-        return [str(x) for x in v]
     if isinstance(v, dict):
         return [f"{k}: {v[k]}" for k in v]
     return [str(v)]
 
+# ---------------------------------------------------------------------------
+# Raw-XML writers – tables and bullet lists make up most of a report, so
+# their w:tbl / w:p elements are built directly on the body instead of via
+# python-docx's per-paragraph / per-cell wrapper objects.
+# ---------------------------------------------------------------------------
+_XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+
+def _append_block(body, el) -> None:
+    """Append *el* to the document body (block items precede w:sectPr)."""
+    from docx.oxml.ns import qn
+    sect_pr = body.find(qn("w:sectPr"))
+    if sect_pr is None:
+        body.append(el)
+    else:
+        sect_pr.addprevious(el)
+
+
+def _add_run(p, text: str) -> None:
+    from docx.oxml.ns import qn
+    from lxml import etree
+    r = etree.SubElement(p, qn("w:r"))
+    for i, line in enumerate(text.split("\n")):
+        if i:
+            etree.SubElement(r, qn("w:br"))
+        t = etree.SubElement(r, qn("w:t"))
+        t.set(_XML_SPACE, "preserve")
+        t.text = line
+
+
+def _add_paragraphs(body, items: List[str], style_id: str) -> None:
+    """One styled paragraph per item (the pPr is built once and copied)."""
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+    from lxml import etree
+    ppr = etree.Element(qn("w:pPr"))
+    etree.SubElement(ppr, qn("w:pStyle")).set(qn("w:val"), style_id)
+    for item in items:
+        p = OxmlElement("w:p")
+        p.append(copy.deepcopy(ppr))
+        _add_run(p, item)
+        _append_block(body, p)
+
+
+def _cell_xml(text: str, w: str) -> str:
+    runs = '</w:t><w:br/><w:t xml:space="preserve">'.join(
+        escape(line) for line in text.split("\n")
+    )
+    return (
+        f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{w}"/></w:tcPr>'
+        f'<w:p><w:r><w:t xml:space="preserve">{runs}</w:t></w:r></w:p></w:tc>'
+    )
+
+
+def _add_kv_table(body, rows, style_id: str, col_w: int) -> None:
+    """Two-column Key/Value table; *col_w* is each column's width in twips.
+
+    The whole ``w:tbl`` is rendered as one string and parsed once, instead
+    of growing the tree node by node.
+    """
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls
+
+    w = str(col_w)
+    body_xml = "".join(
+        "<w:tr>" + "".join(_cell_xml(text, w) for text in cells) + "</w:tr>"
+        for cells in rows
+    )
+    tbl = parse_xml(
+        f"<w:tbl {nsdecls('w')}>"
+        f'<w:tblPr><w:tblStyle w:val="{escape(style_id)}"/>'
+        '<w:tblW w:type="auto" w:w="0"/><w:tblLook w:val="04A0"/></w:tblPr>'
+        f'<w:tblGrid><w:gridCol w:w="{w}"/><w:gridCol w:w="{w}"/></w:tblGrid>'
+        f"{body_xml}</w:tbl>"
+    )
+    _append_block(body, tbl)
+
 # Global section order – edit here if Proposal schema evolves
 SECTION_ORDER = [
     "executive_summary", "problem_statement", "concept_overview",
@@ -64,6 +146,109 @@ SECTION_ORDER = [
     "ip_landscape", "references",
 ]
 
+# ---------------------------------------------------------------------------
+# Network phase – Proposal Writer, DOE and TRL calls for every concept
+# ---------------------------------------------------------------------------
+MAX_CONCURRENT_CONCEPTS = 8   # keeps Azure / evidence APIs under rate limits
+
+# strict-JSON DOE instructions (identical for every concept)
+DOE_INSTRUCTIONS = (
+    "You are an expert experimental designer.  "
+    "For the concept below, *return ONLY valid JSON* in the form:\n"
+    "{\n"
+    '  "experimental_design": [\n'
+    '    "…design 1…",\n'
+    '    "…design 2…",\n'
+    '    "…design 3…"\n'
+    "  ]\n"
+    "}\n\n"
+    "Each design must name key factors, levels, response variable, and a rough N."
+)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+
+async def cached_act(
+    agent_name: str, user_input: str, constraints: str = "", *, scope: str = ""
+) -> Any:
+    """``AGENTS[agent_name].act`` behind :mod:`utils.response_cache`.
+
+    The cache namespace includes a digest of *constraints*, so editing an
+    instruction block never serves answers produced under the old one, and
+    of *scope*, so hits (exact or semantic) never cross scopes – pass the
+    concept title to keep similar concepts from sharing an answer.
+    """
+    from agents import AGENTS  # local import to avoid circular deps
+    from utils import response_cache
+
+    ns = agent_name
+    if constraints:
+        ns += "/" + _digest(constraints)
+    if scope:
+        ns += "@" + _digest(scope)
+    hit = await asyncio.to_thread(response_cache.get, user_input, ns)
+    if hit is not None:
+        return hit
+    # inside a running loop Agent.act hands back its coroutine
+    out = await AGENTS[agent_name].act(user_input, constraints)
+    await asyncio.to_thread(response_cache.put, user_input, ns, out)
+    return out
+
+
+def _cached_trl(text: str) -> tuple:
+    from utils import response_cache
+    from utils.trl_assessor import assess_trl
+
+    hit = response_cache.get(text, "TRL Assessment")
+    if hit is not None:
+        return hit
+    out = assess_trl(text)
+    response_cache.put(text, "TRL Assessment", out)
+    return out
+
+
+async def _prepare_narrative(
+    rec: Dict[str, Any],
+    sem: asyncio.Semaphore,
+    trl_tasks: Dict[str, asyncio.Future],
+) -> tuple:
+    """Run the three independent network calls for *rec* concurrently.
+
+    Returns ``(narrative, doe_raw, (trl_res, evidence))``; any slot may hold
+    the exception raised by that call instead.
+    """
+    # only the concept itself varies – the DOE instructions stay in the
+    # system prompt so every call shares one cacheable prefix
+    doe_input = f"Title: {rec.get('title')}\nDescription: {rec.get('description')}"
+    trl_topic = rec.get("description") or rec.get("title")
+    # compact UTF-8 JSON (no ensure_ascii escapes) – fewer prompt tokens;
+    # DataFrame-sourced records may carry numpy scalars
+    rec_json = orjson.dumps(rec, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    # per-concept cache scope – untitled records only match themselves
+    scope = str(rec.get("title") or rec_json)
+    async with sem:
+        # concepts with the same description share one TRL / evidence run
+        trl_key = " ".join(str(trl_topic).lower().split())
+        if trl_key not in trl_tasks:
+            # run sync assessor on the concept description
+            trl_tasks[trl_key] = asyncio.ensure_future(asyncio.to_thread(_cached_trl, trl_topic))
+        return tuple(await asyncio.gather(
+            cached_act("Proposal Writer Agent", rec_json, scope=scope),
+            cached_act("Proposal Writer Agent", doe_input, DOE_INSTRUCTIONS, scope=scope),
+            asyncio.shield(trl_tasks[trl_key]),
+            return_exceptions=True,
+        ))
+
+
+async def _prepare_all(refined_concepts: List[Dict[str, Any]]) -> List[tuple]:
+    sem = asyncio.Semaphore(MAX_CONCURRENT_CONCEPTS)
+    trl_tasks: Dict[str, asyncio.Future] = {}     # lives for this build only
+    return await asyncio.gather(
+        *(_prepare_narrative(r, sem, trl_tasks) for r in refined_concepts)
+    )
+
 # ---------------------------------------------------------------------------
 # Core builder
 # ---------------------------------------------------------------------------
@@ -87,6 +272,11 @@ def build_docx_report(
         If provided, called with each **narrative JSON** before the content
         is written to the DOCX – perfect for saving into ProposalEditor.
     """
+    from docx import Document
+    from docx.shared import Pt, Inches
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from utils.llm import extract_json
+
     doc = Document()
 
     # --- Cover page -------------------------------------------------------
@@ -101,47 +291,49 @@ def build_docx_report(
         sec.top_margin  = sec.bottom_margin = Inches(0.75)
 
     # ---------------------------------------------------------------------
-    # Loop concepts -------------------------------------------------------
+    # Fetch every concept's narrative / DOE / TRL evidence concurrently ----
     # ---------------------------------------------------------------------
-    from agents import AGENTS  # local import to avoid circular deps
+    prepared = asyncio.run(_prepare_all(refined_concepts))
+
+    body = doc.element.body
+    # resolve every style once – each doc.styles[...] lookup walks the styles part
+    styles = doc.styles
+    table_style = styles["Table Grid"].style_id
+    style_ids = {
+        n: styles[n].style_id
+        for n in ("Heading 1", "Heading 2", "List Bullet", "List Number")
+    }
+    quote_style = styles["Intense Quote"]
+    sec = doc.sections[-1]
+    col_w = (sec.page_width - sec.left_margin - sec.right_margin) // 2 // 635  # EMU → twips
 
-    for rec in refined_concepts:
-        narrative = AGENTS["Proposal Writer Agent"].act(json.dumps(rec), "")
-        # force the title to stay exactly what we passed in
-        # (we assume rec["title"] was always set correctly)
-        narrative["title"] = rec.get("title")
+    # ---------------------------------------------------------------------
+    # Loop concepts (python-docx is not thread-safe → write serially) ------
+    # ---------------------------------------------------------------------
+    for rec, (narrative, raw, trl_out) in zip(refined_concepts, prepared):
+        if isinstance(narrative, BaseException):
+            raise narrative
+        # fill in the title only if the writer left it out – never overwrite
+        # it, so a narrative for the wrong concept stays visible
+        if not narrative.get("title"):
+            narrative["title"] = rec.get("title") or ""
 
         # keep the raw title around too, if you need it later
-        narrative["original_title"] = rec.get("original_title", rec["title"])
+        narrative["original_title"] = rec.get("original_title", rec.get("title") or "")
         if on_each_narrative:
             on_each_narrative(narrative)
         # ── Inject Experimental Design / DOE ────────────────────────────────
         try:
-            # build a strict-JSON prompt
-            exp_prompt = (
-                "You are an expert experimental designer.  "
-                "For the concept below, *return ONLY valid JSON* in the form:\n"
-                "{\n"
-                '  "experimental_design": [\n'
-                '    "…design 1…",\n'
-                '    "…design 2…",\n'
-                '    "…design 3…"\n'
-                "  ]\n"
-                "}\n\n"
-                f"Title: {rec.get('title')}\n"
-                f"Description: {rec.get('description')}\n"
-                "Each design must name key factors, levels, response variable, and a rough N."
-            )
-
-            # get the raw text back
-            raw = AGENTS["Proposal Writer Agent"].act("", exp_prompt)
+            if isinstance(raw, BaseException):
+                raise raw
 
             if isinstance(raw, dict):
                 parsed = raw
             else:
                 try:
-                    parsed = json.loads(raw)
-                except json.JSONDecodeError:
+                    # outermost spans only – bracketed prose before the JSON is skipped
+                    parsed = extract_json(raw)
+                except ValueError:
                     logging.warning("DOE JSON parse failed, falling back to lines.  Raw:\n%s", raw)
                     # fallback: split on lines, strip bullets/numbers
                     lines = [l.strip().lstrip("●-0123456789. ") for l in raw.splitlines() if l.strip()]
@@ -155,8 +347,9 @@ def build_docx_report(
              logging.warning("Failed to generate experimental_design at all: %s", e)
         # ── Inject TRL‐assessor references ─────────────────────────
         try:
-            # run sync assessor on the concept description
-            trl_res, evidence_list = assess_trl(rec.get("description") or rec.get("title"))
+            if isinstance(trl_out, BaseException):
+                raise trl_out
+            trl_res, evidence_list = trl_out
             # evidence_list is a list of dicts with 'source_url', 'title', 'snippet'
             # take up to 15–20 of them
             refs = []
@@ -171,33 +364,30 @@ def build_docx_report(
             # if something goes wrong, leave whatever references were there
             logging.warning("Failed to fetch TRL references: %s", e)
         # Title
-        doc.add_heading(narrative["title"], level=1)
+        _add_paragraphs(body, [str(narrative["title"])], style_ids["Heading 1"])
 
         # Ordered subsections
         for key in SECTION_ORDER:
             if key not in narrative:
                 continue
-            doc.add_heading(key.replace("_", " ").title(), level=2)
+            _add_paragraphs(body, [key.replace("_", " ").title()], style_ids["Heading 2"])
             val = narrative[key]
 
             # dictionaries → 2-col table
             if isinstance(val, dict):
-                tbl = doc.add_table(rows=len(val)+1, cols=2)
-                tbl.style = "Table Grid"
-                tbl.rows[0].cells[0].text = "Key"; tbl.rows[0].cells[1].text = "Value"
-                for row, (k, v) in zip(tbl.rows[1:], val.items()):
-                    row.cells[0].text = str(k)
-                    row.cells[1].text = str(v)
+                rows = [("Key", "Value")]
+                rows.extend((str(k), str(v)) for k, v in val.items())
+                _add_kv_table(body, rows, table_style, col_w)
                 continue
 
             # special case: cost_feasibility dict → TRL highlight + details
             if key == "cost_feasibility" and isinstance(val, dict):
                 cf = val
                 trl_line = f"TRL {cf.get('trl', '?')} – {cf.get('trl_rationale', '')}"
-                doc.add_paragraph(trl_line, style="Intense Quote")
+                doc.add_paragraph(trl_line, style=quote_style)
                 if cf.get("trl_citations"):
-                    for cite in _as_list(cf["trl_citations"]):
-                        doc.add_paragraph(cite, style="List Bullet")
+                    _add_paragraphs(body, _as_list(cf["trl_citations"]),
+                                    style_ids["List Bullet"])
                 if cf.get("cost_breakdown"):
                     doc.add_paragraph(cf["cost_breakdown"])
                 if cf.get("capex_estimate"):
@@ -206,8 +396,7 @@ def build_docx_report(
 
             # list / string fall-through
             bullet_style = "List Number" if key in ("work_plan", "validation_plan") else "List Bullet"
-            for item in _as_list(val):
-                doc.add_paragraph(item, style=bullet_style)
+            _add_paragraphs(body, _as_list(val), style_ids[bullet_style])
 
         doc.add_page_break()
 
@@ -1,30 +1,88 @@
 from __future__ import annotations
 
+import hashlib
+
 import numpy as np
+from diskcache import Cache
 from openai import AzureOpenAI
 from config import PRODUCTS_ENDPOINT, PRODUCTS_OPENAI_KEY
 
 API_VER = "2023-05-15"
 EMBED_MODEL = "text-embedding-3-large"
+EMBED_BATCH = 96                    # texts per embeddings request
+EMBED_CACHE_DIR = ".cache/embeddings"
+EMBED_CACHE_TTL = 7 * 24 * 3600     # seconds
 
 _embed_client = AzureOpenAI(
     azure_endpoint=PRODUCTS_ENDPOINT,
     api_key=PRODUCTS_OPENAI_KEY,
     api_version=API_VER,
 )
+_embed_cache = Cache(EMBED_CACHE_DIR)
+
+
+def _cache_key(text: str) -> str:
+    return f"{EMBED_MODEL}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+
+def _normalize(m: np.ndarray) -> np.ndarray:
+    """L2-normalise rows of *m* in place (zero rows stay zero)."""
+    norms = np.linalg.norm(m, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    m /= norms
+    return m
+
+
+def embed_texts(texts: list[str]) -> np.ndarray:
+    """Return a ``(len(texts), d)`` float32 array of unit-length embeddings.
+
+    Cached texts (disk, keyed by SHA-256) skip the network; the rest are
+    sent in batches of ``EMBED_BATCH`` per request.
+    """
+    keys = [_cache_key(t) for t in texts]
+    vecs: list[np.ndarray | None] = [_embed_cache.get(k) for k in keys]
+    todo = [i for i, v in enumerate(vecs) if v is None]
+
+    for s in range(0, len(todo), EMBED_BATCH):
+        idxs = todo[s:s + EMBED_BATCH]
+        resp = _embed_client.embeddings.create(
+            model=EMBED_MODEL, input=[texts[i] for i in idxs]
+        )
+        for i, d in zip(idxs, sorted(resp.data, key=lambda d: d.index)):
+            v = _normalize(np.asarray(d.embedding, dtype=np.float32))
+            _embed_cache.set(keys[i], v, expire=EMBED_CACHE_TTL)
+            vecs[i] = v
+
+    if not vecs:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.stack(vecs)
 
 
 def embed_text(text: str) -> list[float]:
-    """Return embedding vector for *text* using Azure OpenAI."""
-    resp = _embed_client.embeddings.create(model=EMBED_MODEL, input=text)
-    return resp.data[0].embedding
+    """Return the (unit-length) embedding vector for *text*."""
+    return embed_texts([text])[0].tolist()
 
 
 def cosine_similarity(a: list[float], b: list[float]) -> float:
     """Compute cosine similarity between two embedding vectors."""
-    va = np.array(a, dtype="float32")
-    vb = np.array(b, dtype="float32")
-    denom = np.linalg.norm(va) * np.linalg.norm(vb)
+    va = np.asarray(a, dtype=np.float32)
+    vb = np.asarray(b, dtype=np.float32)
+    denom = np.sqrt(np.dot(va, va) * np.dot(vb, vb))
     if denom == 0:
         return 0.0
     return float(np.dot(va, vb) / denom)
+
+
+def cosine_matrix(
+    a: np.ndarray, b: np.ndarray, out: np.ndarray | None = None
+) -> np.ndarray:
+    """Pairwise cosine similarities between the rows of *a* and *b*.
+
+    Rows are normalised once, then a single ``A @ B.T`` GEMM scores every
+    pair – use this instead of calling :func:`cosine_similarity` in a loop.
+    Pass a preallocated float32 ``(len(a), len(b))`` *out* to reuse memory
+    across repeated calls.
+    """
+    an = _normalize(np.array(a, dtype=np.float32, ndmin=2))
+    bn = _normalize(np.array(b, dtype=np.float32, ndmin=2))
+    return np.matmul(an, bn.T, out=out)
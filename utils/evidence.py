@@ -4,23 +4,99 @@ from __future__ import annotations
 
 import asyncio
 import aiohttp
+import atexit
+import functools
 import logging
-from typing import List, Dict
+import random
+import threading
+from typing import List, Dict, Tuple
+from urllib.parse import urlsplit
+from cachetools import TTLCache
 from utils.query_generator import generate_academic_search_query
-import feedparser
+from lxml import etree
 import time
 
 # WARNING: SSL verification is disabled for all outgoing requests in this module
 # by setting ``ssl=False`` and using connectors with ``ssl=False``. This bypasses
 # certificate checks and should only be used in trusted environments.
 
-from .llm import serp_lookup
+from .llm import serp_lookup_async
 from agents import AGENTS
 
 Evidence = Dict[str, str]
 
 MAX_SNIPPET_LEN = 300
 MAX_RESULTS = 15
+MAX_HEAD_CONCURRENCY = 16
+URL_OK_MAX = 4096           # reachable URLs remembered at once
+URL_OK_TTL = 3600           # seconds before a reachable URL is re-checked
+# Hosts whose links come straight from a scholarly API and are not HEAD-checked
+TRUSTED_HOSTS = frozenset({
+    "arxiv.org", "export.arxiv.org",
+    "doi.org", "dx.doi.org", "api.crossref.org",
+    "patents.google.com",
+})
+
+# URLs that answered a HEAD recently.  Failures are never cached, so a
+# transient error only costs one re-check (only touched on the evidence
+# I/O loop, so no lock needed).
+_URL_OK: TTLCache = TTLCache(maxsize=URL_OK_MAX, ttl=URL_OK_TTL)
+
+# ---------------------------------------------------------------------------
+# Shared keep-alive session
+# ---------------------------------------------------------------------------
+# Callers reach gather_evidence from many short-lived loops (asyncio.run in
+# assess_trl, worker threads in the report build), and an aiohttp session is
+# bound to the loop that created it.  All evidence I/O therefore runs on one
+# background loop that owns a single pooled session, so TCP/TLS connections
+# and DNS lookups are reused across every concept instead of per call.
+_IO_LOOP: asyncio.AbstractEventLoop | None = None
+_SESSION: aiohttp.ClientSession | None = None
+_io_lock = threading.Lock()
+
+
+def _io_loop() -> asyncio.AbstractEventLoop:
+    global _IO_LOOP
+    with _io_lock:
+        if _IO_LOOP is None:
+            _IO_LOOP = asyncio.new_event_loop()
+            threading.Thread(
+                target=_IO_LOOP.run_forever, name="evidence-io", daemon=True
+            ).start()
+    return _IO_LOOP
+
+
+async def _on_io_loop(coro):
+    """Await *coro* on the evidence I/O loop, whichever loop we are on."""
+    loop = _io_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Return the pooled session (must be awaited on the evidence I/O loop)."""
+    global _SESSION
+    if _SESSION is None or _SESSION.closed:
+        _SESSION = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=100, limit_per_host=20, ttl_dns_cache=300, ssl=False
+            )
+        )
+    return _SESSION
+
+
+async def _with_session(fetch, *args):
+    return await fetch(*args, session=await _get_session())
+
+
+@atexit.register
+def _close_session() -> None:
+    if _SESSION is not None and not _SESSION.closed and _IO_LOOP is not None:
+        try:
+            asyncio.run_coroutine_threadsafe(_SESSION.close(), _IO_LOOP).result(timeout=5)
+        except Exception:  # pragma: no cover - interpreter shutdown
+            pass
 
 # Escape backslashes and quotes to avoid JSON issues downstream
 def sanitize_snippet(snippet: str) -> str:
@@ -37,31 +113,60 @@ def _on_backoff(details):
     )
 
 
-def retry_async(max_tries: int = 4, initial: float = 1.0, factor: float = 2.0):
-    """Retry decorator for async functions with exponential backoff."""
+# Per-function circuit breaker: name → (consecutive failed calls, open until)
+BREAKER_THRESHOLD = 3          # failed calls in a row before the circuit opens
+BREAKER_COOLDOWN  = 30.0       # seconds to short-circuit once open
+_BREAKERS: Dict[str, Tuple[int, float]] = {}
+
+
+def retry_async(max_tries: int = 4, initial: float = 1.0, factor: float = 2.0,
+                fallback=list):
+    """Retry decorator for async functions with jittered exponential backoff.
+
+    Once ``BREAKER_THRESHOLD`` calls in a row have exhausted their retries,
+    further calls skip the network and return ``fallback()`` for
+    ``BREAKER_COOLDOWN`` seconds, so a degraded provider costs every concept
+    nothing instead of the full retry budget.
+    """
 
     def decorator(func):
+        name = func.__name__
+
+        @functools.wraps(func)      # exposes the undecorated body as __wrapped__
         async def wrapper(*args, **kwargs):
+            fails, open_until = _BREAKERS.get(name, (0, 0.0))
+            if time.time() < open_until:
+                logging.info("Circuit open for %s; skipping call", name)
+                return fallback()
+
             delay = initial
             for attempt in range(1, max_tries + 1):
                 try:
-                    return await func(*args, **kwargs)
+                    result = await func(*args, **kwargs)
                 except (aiohttp.ClientError, asyncio.TimeoutError):
                     if attempt == max_tries:
+                        fails += 1
+                        if fails >= BREAKER_THRESHOLD:
+                            open_until = time.time() + BREAKER_COOLDOWN
+                        _BREAKERS[name] = (fails, open_until)
                         raise
+                    wait = random.uniform(0, delay)   # full jitter
                     _on_backoff({
-                        'wait': delay,
+                        'wait': wait,
                         'tries': attempt,
-                        'target': func.__name__,
+                        'target': name,
                     })
-                    await asyncio.sleep(delay)
+                    await asyncio.sleep(wait)
                     delay *= factor
+                else:
+                    _BREAKERS.pop(name, None)
+                    return result
         return wrapper
 
     return decorator
 
 
-@retry_async()
+@retry_async(fallback=dict)
 async def _fetch_json(session: aiohttp.ClientSession, url: str, **params) -> dict:
     """Fetch JSON with retries and a longer timeout."""
     async with session.get(url, params=params, timeout=15, ssl=False) as resp:
@@ -71,10 +176,15 @@ async def _fetch_json(session: aiohttp.ClientSession, url: str, **params) -> dic
 
 async def fetch_crossref(query: str, k: int = 5,
                          session: aiohttp.ClientSession | None = None) -> List[Evidence]:
-    sess = session or aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=False))
+    if session is None:
+        return await _on_io_loop(_with_session(fetch_crossref, query, k))
+    sess = session
     try:
         try:
-            core_query = generate_academic_search_query(query, max_keywords=14)
+            # off-loop: the shared I/O loop must never block on an LLM call
+            core_query = await asyncio.to_thread(
+                generate_academic_search_query, query, max_keywords=14
+            )
         except Exception:
             # Fallback if LLM call fails; shorten manually
             core_query = query[:100]
@@ -102,13 +212,36 @@ async def fetch_crossref(query: str, k: int = 5,
             exc_info=True,
         )
         return []
-    finally:
-        if session is None:
-            await sess.close()
 
 
-@retry_async()
+ATOM_NS = {"a": "http://www.w3.org/2005/Atom"}
+_ATOM_ENTRY = "{http://www.w3.org/2005/Atom}entry"
+
+
+def _arxiv_entry(entry) -> Evidence:
+    """Pull title / summary / abstract link out of one Atom ``<entry>``."""
+    link = entry.find("a:link[@rel='alternate']", ATOM_NS)
+    return {
+        "title": entry.findtext("a:title", default="", namespaces=ATOM_NS).strip(),
+        "snippet": entry.findtext("a:summary", default="", namespaces=ATOM_NS)
+                        .strip()[:MAX_SNIPPET_LEN],
+        "source_url": link.get("href") if link is not None
+                      else entry.findtext("a:id", default="", namespaces=ATOM_NS),
+    }
 
+
+def _drain_entries(parser: etree.XMLPullParser) -> List[Evidence]:
+    """Convert every completed ``<entry>`` and free it from the partial tree."""
+    out = []
+    for _, entry in parser.read_events():
+        out.append(_arxiv_entry(entry))
+        entry.clear()
+        while entry.getprevious() is not None:
+            del entry.getparent()[0]
+    return out
+
+
+@retry_async()
 async def fetch_arxiv(query: str, k: int = 5,
                       session: aiohttp.ClientSession | None = None) -> List[Evidence]:
     """
@@ -119,6 +252,10 @@ async def fetch_arxiv(query: str, k: int = 5,
        (exponential backoff 1s→2s→4s). Return a list of dicts or [].
     """
 
+    if session is None:
+        # re-enter the undecorated body – this call is already inside retry_async
+        return await _on_io_loop(_with_session(fetch_arxiv.__wrapped__, query, k))
+
     # === 1) Condense via LLM (run in thread + 60s timeout) ===
     llm_timeout = 60  # seconds
 
@@ -164,13 +301,7 @@ async def fetch_arxiv(query: str, k: int = 5,
         logging.info("After fallback, core_query is empty—returning []")
         return []
 
-    # === 2) Prepare HTTP session (if not provided) ===
-    own_session = False
-    if session is None:
-        own_session = True
-        session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=False))
-
-    # === 3) Retry loop with exponential backoff ===
+    # === 2) Retry loop with exponential backoff ===
     max_attempts = 3
     backoff = 1.0  # seconds
 
@@ -190,20 +321,16 @@ async def fetch_arxiv(query: str, k: int = 5,
                 timeout=60
             ) as resp:
                 resp.raise_for_status()
-                text = await resp.text()
-
-            feed = feedparser.parse(text)
-            results: List[Evidence] = []
-            for entry in feed.entries[:k]:
-                title = getattr(entry, "title", "")
-                summary = getattr(entry, "summary", "")
-                snippet = summary[:MAX_SNIPPET_LEN]
-                link = getattr(entry, "link", "")
-                results.append({
-                    "title": title,
-                    "snippet": snippet,
-                    "source_url": link
-                })
+                # parse entries as bytes arrive instead of buffering the body;
+                # read to the end so the connection returns to the pool
+                parser = etree.XMLPullParser(events=("end",), tag=_ATOM_ENTRY)
+                results: List[Evidence] = []
+                async for chunk in resp.content.iter_any():
+                    parser.feed(chunk)
+                    results.extend(_drain_entries(parser))
+                parser.close()
+                results.extend(_drain_entries(parser))
+            results = results[:k]
 
             logging.info(f"arXiv fetch succeeded on attempt {attempt}")
             return results[:MAX_RESULTS]
@@ -217,24 +344,25 @@ async def fetch_arxiv(query: str, k: int = 5,
                 logging.error(f"arXiv fetch failed after {max_attempts} attempts; returning []")
                 break
 
-            logging.info(f"Waiting {backoff:.1f}s before retrying arXiv fetch")
-            await asyncio.sleep(backoff)
+            wait = random.uniform(0, backoff)   # full jitter – don't retry in lockstep
+            logging.info(f"Waiting {wait:.1f}s before retrying arXiv fetch")
+            await asyncio.sleep(wait)
             backoff *= 2  # backoff: 1s → 2s → 4s
 
         except Exception as e:
             logging.error("Unexpected error in fetch_arxiv: %s", e, exc_info=True)
             break
 
-    if own_session:
-        await session.close()
-
     return []
 
 
 @retry_async()
 async def fetch_patents(query: str, k: int = 5,
                         session: aiohttp.ClientSession | None = None) -> List[Evidence]:
-    sess = session or aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=False))
+    if session is None:
+        # re-enter the undecorated body – this call is already inside retry_async
+        return await _on_io_loop(_with_session(fetch_patents.__wrapped__, query, k))
+    sess = session
     try:
         params = {"q": query, "o": {"per_page": k}}
         body = {"q": query, "o": {"per_page": k}}
@@ -259,13 +387,13 @@ async def fetch_patents(query: str, k: int = 5,
             exc_info=True,
         )
         return []
-    finally:
-        if session is None:
-            await sess.close()
 
 
-async def fetch_open_web(query: str, k: int = 5) -> List[Evidence]:
-    raw = await asyncio.to_thread(serp_lookup, query, k)
+async def fetch_open_web(query: str, k: int = 5,
+                         session: aiohttp.ClientSession | None = None) -> List[Evidence]:
+    if session is None:
+        return await _on_io_loop(_with_session(fetch_open_web, query, k))
+    raw = await serp_lookup_async(session, query, k)
     out = []
     for item in raw:
         title = item.get("title") or item.get("snippet")
@@ -277,37 +405,81 @@ async def fetch_open_web(query: str, k: int = 5) -> List[Evidence]:
     return out
 
 
-async def validate_urls(evidence: List[Evidence]) -> List[Evidence]:
-    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=False)) as sess:
-        # SSL verification is disabled for this validation session.
-        async def _ok(url: str) -> bool:
+def _url_key(url: str) -> tuple:
+    """Identity of *url* for dedup: scheme, case of host and trailing / ignored."""
+    parts = urlsplit(url.strip())
+    return parts.netloc.lower(), parts.path.rstrip("/"), parts.query
+
+
+def _is_trusted(url: str) -> bool:
+    return urlsplit(url.strip()).netloc.lower() in TRUSTED_HOSTS
+
+
+async def validate_urls(evidence: List[Evidence],
+                        session: aiohttp.ClientSession | None = None) -> List[Evidence]:
+    if session is None:
+        return await _on_io_loop(_with_session(validate_urls, evidence))
+    sess = session
+    sem = asyncio.Semaphore(MAX_HEAD_CONCURRENCY)
+
+    async def _ok(url: str) -> bool:
+        async with sem:
             try:
                 async with sess.head(url, timeout=5, ssl=False) as resp:
                     return resp.status < 400
             except Exception:
                 return False
 
-        tasks = [_ok(ev["source_url"]) for ev in evidence]
-        ok_list = await asyncio.gather(*tasks)
-    return [ev for ev, ok in zip(evidence, ok_list) if ok]
+    # one HEAD per distinct, not-yet-checked http(s) URL
+    todo = list({
+        url for url in (ev.get("source_url") for ev in evidence)
+        if isinstance(url, str) and url.startswith(("http://", "https://"))
+        and url not in _URL_OK
+    })
+    ok_now = set()
+    for url, ok in zip(todo, await asyncio.gather(*map(_ok, todo))):
+        if ok:
+            _URL_OK[url] = True
+            ok_now.add(url)
+    return [
+        ev for ev in evidence
+        if ev.get("source_url") in ok_now or _URL_OK.get(ev.get("source_url"), False)
+    ]
 
 
 async def gather_evidence(query: str) -> List[Evidence]:
-    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=False)) as sess:
-        # SSL verification is disabled for this session as well.
-        tasks = [
-            fetch_arxiv(query, 5, sess),
-            fetch_crossref(query, 5, sess),
-            #fetch_patents(query, 2, sess),
-            fetch_open_web(query, 3),
-        ]
-        chunks = await asyncio.gather(*tasks, return_exceptions=True)
+    return await _on_io_loop(_gather_evidence(query))
+
+
+async def _gather_evidence(query: str) -> List[Evidence]:
+    sess = await _get_session()
+    tasks = [
+        fetch_arxiv(query, 5, sess),
+        fetch_crossref(query, 5, sess),
+        #fetch_patents(query, 2, sess),
+        fetch_open_web(query, 3, sess),
+    ]
+    chunks = await asyncio.gather(*tasks, return_exceptions=True)
     evidence: List[Evidence] = []
     for chunk in chunks:
         if isinstance(chunk, Exception):
             logging.warning("Evidence task failed: %s", chunk)
         else:
             evidence.extend(chunk)
+    # drop mirrors (e.g. an open-web hit for an arXiv abstract) before they
+    # eat MAX_RESULTS slots and duplicate HEAD checks
+    seen: set = set()
+    evidence = [
+        ev for ev in evidence
+        if ev.get("source_url")
+        and not ((key := _url_key(ev["source_url"])) in seen or seen.add(key))
+    ]
     evidence = evidence[:MAX_RESULTS]
-    evidence = await validate_urls(evidence)
-    return evidence
+    # API-sourced links (arXiv, DOI, patents) resolve by construction –
+    # only the open-web hits need a HEAD check
+    untrusted = [ev for ev in evidence if not _is_trusted(ev["source_url"])]
+    reachable = {id(ev) for ev in await validate_urls(untrusted, sess)}
+    return [
+        ev for ev in evidence
+        if id(ev) in reachable or _is_trusted(ev["source_url"])
+    ]
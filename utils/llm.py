@@ -16,8 +16,11 @@ serp_results = serp_lookup("roof insulation TRL 6", k=5)
 from __future__ import annotations
 
 import json, logging, re, urllib3, requests, html
-from typing import Any, List, Dict
-from config import AZURE_OPENAI_KEY, SERP_API_KEY
+from typing import Any, List, Dict, TYPE_CHECKING
+from config import AZURE_OPENAI_KEY, SERP_API_KEY, AZURE_CA_BUNDLE
+
+if TYPE_CHECKING:                 # imported lazily by the schema-validated path
+    import jsonschema
 
 urllib3.disable_warnings()
 
@@ -45,8 +48,41 @@ def safe_headers(hdrs: dict) -> dict:
 # ===========================================================================
 # ✨  2.  Azure OpenAI chat wrapper  =========================================
 # ===========================================================================
-import time
+import time, atexit
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ReadTimeout
+from urllib3.util.retry import Retry
+
+# One pooled session for every Azure call: keep-alive connections are reused
+# across the many concurrent extraction / agent calls instead of paying a
+# fresh TCP+TLS handshake per request.
+LLM_POOL_SIZE = 64               # = LLM worker threads, so each keeps a live connection
+LLM_TIMEOUT   = (5, 600)          # (connect, read) seconds – o3 replies can be slow
+LLM_VERIFY    = AZURE_CA_BUNDLE or True   # always verify TLS; custom CA if behind a proxy
+
+_llm_session = requests.Session()
+_llm_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=LLM_POOL_SIZE,
+        pool_maxsize=LLM_POOL_SIZE,
+        # Transport retries cover only failed connects and 429/5xx replies.
+        # A read timeout is never retried here – it can take LLM_TIMEOUT[1]
+        # seconds and call_llm_with_schema already retries on top.
+        max_retries=Retry(
+            total=3,
+            connect=3,
+            read=0,
+            other=0,
+            status=3,
+            backoff_factor=1.0,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"POST"}),   # status retries are method-gated
+            raise_on_status=False,
+        ),
+    ),
+)
+atexit.register(_llm_session.close)
 
 # ─── utils/llm.py  (REPLACE the existing call_llm function) ────────────────
 def call_llm(endpoint, deployment, version, system_prompt, user_prompt, api_key=None) -> str:
@@ -66,9 +102,19 @@ def call_llm(endpoint, deployment, version, system_prompt, user_prompt, api_key=
         ],
         "max_completion_tokens": 15000,
     }
-    resp = requests.post(url, headers=headers, json=payload, verify=False)
+    resp = _llm_session.post(url, headers=headers, json=payload, verify=LLM_VERIFY, timeout=LLM_TIMEOUT)
     if resp.status_code == 200:
-        return resp.json()["choices"][0]["message"]["content"].strip()
+        data = resp.json()
+        # Azure caches identical ≥1024-token prompt prefixes automatically, so
+        # keep system prompts stable and put per-call data in the user turn.
+        usage = data.get("usage") or {}
+        logging.debug(
+            "LLM %s: %s prompt tokens (%s cached)",
+            deployment,
+            usage.get("prompt_tokens"),
+            (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0),
+        )
+        return data["choices"][0]["message"]["content"].strip()
     logging.error(f"LLM fail {resp.status_code}: {resp.text}")
     return f"Error {resp.status_code}: {resp.text}"
 
@@ -76,21 +122,50 @@ def call_llm(endpoint, deployment, version, system_prompt, user_prompt, api_key=
 # 🔍  3.  Google SERP API helper  ===========================================
 # ===========================================================================
 
-def serp_lookup(query: str, k: int = 5) -> List[Dict[str, str]]:
-    """Return up to *k* organic result dicts using SerpAPI (Google engine)."""
+SERP_URL = "https://serpapi.com/search.json"
+SERP_TIMEOUT = 30                # seconds
+
+
+def _serp_params(query: str, k: int) -> Dict[str, Any] | None:
+    """SerpAPI query parameters, or ``None`` (logged) when no key is set."""
     if not SERP_API_KEY:
         logging.warning("SERP_API_KEY not set – skipping search for '%s'", query)
-        return []
-    params = {
+        return None
+    return {
         "engine": "google",
         "q":      query,
         "api_key": SERP_API_KEY,
         "num":    k,
     }
+
+
+def _serp_results(data: Dict[str, Any]) -> List[Dict[str, str]]:
+    return data.get("organic_results", [])
+
+
+def serp_lookup(query: str, k: int = 5) -> List[Dict[str, str]]:
+    """Return up to *k* organic result dicts using SerpAPI (Google engine)."""
+    params = _serp_params(query, k)
+    if params is None:
+        return []
     try:
-        r = requests.get("https://serpapi.com/search.json", params=params, timeout=30)
+        r = requests.get(SERP_URL, params=params, timeout=SERP_TIMEOUT)
         r.raise_for_status()
-        return r.json().get("organic_results", [])
+        return _serp_results(r.json())
+    except Exception as e:
+        logging.error("SERP lookup failed: %s", e)
+        return []
+
+
+async def serp_lookup_async(session, query: str, k: int = 5) -> List[Dict[str, str]]:
+    """Async :func:`serp_lookup` on a caller-owned ``aiohttp.ClientSession``."""
+    params = _serp_params(query, k)
+    if params is None:
+        return []
+    try:
+        async with session.get(SERP_URL, params=params, timeout=SERP_TIMEOUT) as r:
+            r.raise_for_status()
+            return _serp_results(await r.json())
     except Exception as e:
         logging.error("SERP lookup failed: %s", e)
         return []
@@ -99,40 +174,66 @@ def serp_lookup(query: str, k: int = 5) -> List[Dict[str, str]]:
 # 🕵️‍♂️  4.  Robust JSON extractor  ==========================================
 # ===========================================================================
 
-def extract_json(blob: str) -> Any:
-    """Return the first valid JSON object/array found in *blob*.
+# A JSON string literal (escape-aware) or a single bracket – strings are
+# consumed whole so braces inside values never affect the depth count.
+_JSON_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]]')
+
+
+_JSON_START = re.compile(r"[\[{]")
+_DECODER = json.JSONDecoder()
 
-    Strips markdown fences, does brace‑count scanning so it survives extra
-    prose the model might hallucinate.
+
+def _json_spans(s: str):
+    """Yield ``(start, end)`` of each outermost balanced ``{…}`` / ``[…]`` in *s*.
+
+    Prose between spans is skipped bracket-to-bracket, so stray quotes
+    outside JSON never throw off the string tokeniser.
     """
-    txt = re.sub(r"^```(?:json)?\s*|\s*```$", "", blob.strip(), flags=re.I | re.S)
+    pos = 0
+    while (m := _JSON_START.search(s, pos)) is not None:
+        depth, start = 0, m.start()
+        for tok in _JSON_TOKEN.finditer(s, start):
+            t = tok.group()
+            if t in "{[":
+                depth += 1
+            elif t in "}]" and depth:
+                depth -= 1
+                if depth == 0:
+                    yield start, tok.end()
+                    pos = tok.end()
+                    break
+        else:
+            return                              # unbalanced to the end
 
-    # locate first '{' or '['
-    first_curly  = txt.find("{")
-    first_square = txt.find("[")
-    if first_curly == -1 and first_square == -1:
-        raise ValueError("No JSON object/array found in text")
 
-    start = first_curly if (first_curly != -1 and (first_curly < first_square or first_square == -1)) else first_square
-    stack, end = [], None
-    for i, ch in enumerate(txt[start:]):
-        if ch in "[{":
-            stack.append(ch)
-        elif ch in "]}":
-            if not stack:
-                break
-            stack.pop()
-            if not stack:
-                end = start + i + 1
-                break
-    if end is None:
-        raise ValueError("Unbalanced braces/brackets in JSON blob")
+def find_json_block(s: str) -> str | None:
+    """Return the first balanced ``{…}`` / ``[…]`` span in *s*, or ``None``."""
+    for start, end in _json_spans(s):
+        return s[start:end]
+    return None
 
-    return json.loads(txt[start:end])
+
+def extract_json(blob: str) -> Any:
+    """Return the first valid top-level JSON object/array found in *blob*.
+
+    Only outermost balanced spans are tried, so malformed JSON never yields
+    one of its nested fragments.  The C decoder (``raw_decode``) parses each
+    span in place – no slicing or fence stripping copies – and it survives
+    extra prose the model might hallucinate, including braces in strings.
+    """
+    for start, end in _json_spans(blob):
+        try:
+            obj, stop = _DECODER.raw_decode(blob, start)
+        except json.JSONDecodeError:
+            continue
+        if stop == end:
+            return obj
+    raise ValueError("No valid JSON object/array found in text")
 
 
 
 import textwrap
+from functools import lru_cache
 
 def minimum_schema_prompt(schema: dict) -> str:
     """
@@ -141,8 +242,16 @@ def minimum_schema_prompt(schema: dict) -> str:
       • output exactly one JSON object (no markdown fences)
       • allow extra keys / nesting
     """
+    # dicts aren't hashable – memoise on the canonical compact JSON, which
+    # doubles as the reference text (indentation is only wasted tokens)
+    return _schema_prompt(json.dumps(schema, separators=(",", ":"), sort_keys=True))
+
+
+@lru_cache(maxsize=64)
+def _schema_prompt(schema_json: str) -> str:
+    schema   = json.loads(schema_json)
     required = ", ".join(schema.get("required", []))
-    pretty   = json.dumps(schema, indent=2)
+    pretty   = schema_json
 
     prompt = f"""
     You are a **JSON-only** agent.
@@ -158,8 +267,60 @@ def minimum_schema_prompt(schema: dict) -> str:
     {pretty}
     """
     return textwrap.dedent(prompt).lstrip()
-import json, logging, jsonschema, asyncio
+import json, logging, asyncio
 from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+# Dedicated threads for blocking LLM round-trips, so a burst of agent calls
+# never queues behind other asyncio.to_thread work on the default executor.
+_LLM_POOL = ThreadPoolExecutor(max_workers=LLM_POOL_SIZE, thread_name_prefix="llm")
+
+# Trivially fixable validation errors are patched in place instead of paying
+# for another LLM round-trip; anything else still goes back to the model.
+_INT_LIKE = re.compile(r"[+-]?\d+")
+MAX_LOCAL_FIXES = 20                      # per reply, before giving up
+
+
+def _local_fix(obj: Any, e: jsonschema.ValidationError) -> bool:
+    """Patch *obj* in place for a trivially fixable *e*; True if it changed."""
+    if e.validator == "type" and e.absolute_path:
+        want = e.validator_value
+        want = {want} if isinstance(want, str) else set(want)
+        inst = e.instance
+        if isinstance(inst, str) and want & {"integer", "number"} and _INT_LIKE.fullmatch(inst.strip()):
+            new = int(inst)
+        elif inst is None and "string" in want:
+            new = ""
+        else:
+            return False
+        *parents, leaf = e.absolute_path
+        for p in parents:
+            obj = obj[p]
+        obj[leaf] = new
+        return True
+    if e.validator == "required" and isinstance(e.instance, dict):
+        props = e.schema.get("properties", {})
+        missing = [
+            k for k in e.validator_value
+            if k not in e.instance and props.get(k, {}).get("type") == "string"
+        ]
+        for k in missing:
+            e.instance[k] = ""
+        return bool(missing)
+    return False
+
+
+def _coerce_locally(obj: Any, validator) -> bool:
+    """Apply :func:`_local_fix` until *obj* validates; False if it cannot."""
+    for _ in range(MAX_LOCAL_FIXES):
+        e = next(validator.iter_errors(obj), None)
+        if e is None:
+            return True
+        if not _local_fix(obj, e):
+            return False
+    return False
+
 
 def call_llm_with_schema(
     endpoint: str,
@@ -177,6 +338,9 @@ def call_llm_with_schema(
     Returns the validated object (dict/list).
     Raises RuntimeError on repeated failure.
     """
+    from jsonschema import ValidationError
+    from schemas import get_validator          # compiled once per schema
+
     # 1) prepend the minimum-schema helper
     sys_prompt = minimum_schema_prompt(schema) + "\n" + role_prompt
 
@@ -190,11 +354,15 @@ def call_llm_with_schema(
         except Exception as e:
             err = f"Attempt {attempt}: JSON parse error – {e}"
         else:
+            validator = get_validator(schema)
             try:
-                jsonschema.validate(obj, schema)
+                validator.validate(obj)
                 return obj                     # 🎉 success!
-            except jsonschema.ValidationError as e:
+            except ValidationError as e:
                 err = f"Attempt {attempt}: schema validation – {e}"
+            if _coerce_locally(obj, validator):
+                logging.info("%s; fixed locally", err)
+                return obj
 
         logging.warning("%s; retrying…" % err)
 
@@ -225,21 +393,23 @@ async def call_llm_with_schema_async(
     max_attempts: int = 3,
     api_key: str | None = None,
 ) -> Dict[str, Any]:
-    """Async wrapper around :func:`call_llm_with_schema`."""
-    return await asyncio.to_thread(
-        call_llm_with_schema,
-        endpoint,
-        deployment,
-        version,
-        role_prompt,
-        user_prompt,
-        schema,
-        max_attempts,
-        api_key,
+    """Async wrapper around :func:`call_llm_with_schema` (runs on ``_LLM_POOL``)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _LLM_POOL,
+        partial(
+            call_llm_with_schema,
+            endpoint,
+            deployment,
+            version,
+            role_prompt,
+            user_prompt,
+            schema,
+            max_attempts,
+            api_key,
+        ),
     )
 
-import asyncio
-from .llm import call_llm_with_schema_async
 
 def call_llm_with_schema_sync(
     *,
@@ -253,20 +423,18 @@ def call_llm_with_schema_sync(
     **kwargs
 ) -> Any:
     """
-    Synchronous wrapper around the async call_llm_with_schema_async.
-    Passes through all parameters.
+    Keyword-only synchronous entry point to :func:`call_llm_with_schema`.
+    Passes through all parameters (no event loop or thread hop needed).
     """
-    return asyncio.run(
-        call_llm_with_schema_async(
-            endpoint=endpoint,
-            deployment=deployment,
-            version=version,
-            role_prompt=role_prompt,
-            user_prompt=user_prompt,
-            schema=schema,
-            api_key=api_key,
-            **kwargs,
-        )
+    return call_llm_with_schema(
+        endpoint=endpoint,
+        deployment=deployment,
+        version=version,
+        role_prompt=role_prompt,
+        user_prompt=user_prompt,
+        schema=schema,
+        api_key=api_key,
+        **kwargs,
     )
 
 # End of file
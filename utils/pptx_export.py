@@ -3,6 +3,40 @@ import pandas as pd
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
+# PUBLIC EXPORT
+__all__ = ["build_pptx_from_df"]
+
+# Slide geometry / sizes – Length objects are immutable, build them once
+_TITLE_SIZE = Pt(28)
+_ROW_HEIGHT = Pt(18)
+_TABLE_BOX  = (Inches(0.5), Inches(1.5), Inches(9.4), Inches(5.6))   # left, top, width, height
+_COL_WIDTHS = (Inches(1.0), Inches(8.4))
+_CELL_FONT  = Pt(10)
+_MARGIN_ATTRS = ("marL", "marR", "marT", "marB")
+
+# (table label, DataFrame column) per concept-card row, by workflow
+_DEFAULT_FIELDS = (
+    ("Agent",                   "agent"),
+    ("Description",             "description"),
+    ("Novelty",                 "novelty_reasoning"),
+    ("Feasibility",             "feasibility_reasoning"),
+    ("Validated TRL",           "validated_trl"),
+    ("Validated TRL reasoning", "validated_trl_reasoning"),
+    ("Components",              "components"),
+    ("References",              "references"),
+)
+_XINDUSTRY_FIELDS = (
+    ("Agent",                   "agent"),
+    ("Description",             "description"),
+    ("Industry",                "novelty_reasoning"),      # renamed
+    ("Original Solution",       "original_solution"),      # new
+    ("Adaptation Challenges",   "adaptation_challenges"),  # new
+    ("Feasibility",             "feasibility_reasoning"),
+    ("Validated TRL",           "validated_trl"),
+    ("Validated TRL reasoning", "validated_trl_reasoning"),
+    ("Components",              "components"),
+    ("References",              "references"),
+)
 
 def build_pptx_from_df(df: pd.DataFrame, out_stream: BytesIO | str, workflow: str = "default") -> None:
     prs = Presentation()
@@ -16,69 +50,60 @@ def build_pptx_from_df(df: pd.DataFrame, out_stream: BytesIO | str, workflow: st
         bold: bool = False,
         align=PP_ALIGN.LEFT
     ):
-        cell.margin_top = cell.margin_bottom = cell.margin_left = cell.margin_right = Pt(0)
+        # zero all four margins in one tcPr touch instead of four setters
+        tc_pr = cell._tc.get_or_add_tcPr()
+        for attr in _MARGIN_ATTRS:
+            tc_pr.set(attr, "0")
 
         tf = cell.text_frame
         tf.vertical_anchor = MSO_ANCHOR.TOP
         tf.word_wrap = True
 
-        tf.clear()
+        # assigning .text already replaces the old paragraphs (no clear());
+        # each resulting paragraph (one per line) carries at most one run
         tf.text = str(text).strip()
+        size = _CELL_FONT if font_size == 10 else Pt(font_size)
 
         for para in tf.paragraphs:
             para.alignment = align
             for run in para.runs:
-                run.font.name = font_name
-                run.font.size = Pt(font_size)
-                run.font.bold = bold
+                font = run.font
+                font.name = font_name
+                font.size = size
+                font.bold = bold
+
+    # Fields (conditional by workflow)
+    field_defs = _XINDUSTRY_FIELDS if workflow == "Cross-Industry Ideation" else _DEFAULT_FIELDS
+    labels = [lbl for lbl, _ in field_defs]
+
+    # one reindex up front (missing columns → ""), then plain tuples per row –
+    # iterrows boxes every row into a Series
+    cards = df.reindex(columns=["title", *(c for _, c in field_defs)], fill_value="")
+    if "title" not in df.columns:
+        cards["title"] = "Untitled"
+    layout = prs.slide_layouts[5]
 
-    for _, row in df.iterrows():
-        slide = prs.slides.add_slide(prs.slide_layouts[5])
+    for title, *values in cards.itertuples(index=False, name=None):
+        slide = prs.slides.add_slide(layout)
 
         # Title
         title_shape = slide.shapes.title
-        title_shape.text = str(row.get("title", "Untitled")).strip()
+        title_shape.text = str(title).strip()
         for p in title_shape.text_frame.paragraphs:
             for r in p.runs:
                 r.font.name = "Calibri"
-                r.font.size = Pt(28)
+                r.font.size = _TITLE_SIZE
                 r.font.bold = True
 
-        # Fields (conditional by workflow)
-        if workflow == "Cross-Industry Ideation":
-            fields = [
-                ("Agent",                   row.get("agent", "")),
-                ("Description",             row.get("description", "")),
-                ("Industry",                row.get("novelty_reasoning", "")),  # renamed
-                ("Original Solution",       row.get("original_solution", "")),  # new
-                ("Adaptation Challenges",   row.get("adaptation_challenges", "")),  # new
-                ("Feasibility",             row.get("feasibility_reasoning", "")),
-                ("Validated TRL",           row.get("validated_trl", "")),
-                ("Validated TRL reasoning", row.get("validated_trl_reasoning", "")),
-                ("Components",              row.get("components", "")),
-                ("References",              row.get("references", "")),
-            ]
-        else:
-            fields = [
-                ("Agent",                   row.get("agent", "")),
-                ("Description",             row.get("description", "")),
-                ("Novelty",                 row.get("novelty_reasoning", "")),
-                ("Feasibility",             row.get("feasibility_reasoning", "")),
-                ("Validated TRL",           row.get("validated_trl", "")),
-                ("Validated TRL reasoning", row.get("validated_trl_reasoning", "")),
-                ("Components",              row.get("components", "")),
-                ("References",              row.get("references", "")),
-            ]
+        fields = zip(labels, values)
 
         # Table
-        n_rows, n_cols = len(fields) + 1, 2
-        left, top, width, height = Inches(0.5), Inches(1.5), Inches(9.4), Inches(5.6)
-        tbl = slide.shapes.add_table(n_rows, n_cols, left, top, width, height).table
+        n_rows, n_cols = len(field_defs) + 1, 2
+        tbl = slide.shapes.add_table(n_rows, n_cols, *_TABLE_BOX).table
 
-        tbl.columns[0].width = Inches(1.0)
-        tbl.columns[1].width = Inches(8.4)
+        tbl.columns[0].width, tbl.columns[1].width = _COL_WIDTHS
         for r in tbl.rows:
-            r.height = Pt(18)
+            r.height = _ROW_HEIGHT
 
         # Header
         setup_cell(tbl.cell(0, 0), "Field", font_size=10, bold=True,  align=PP_ALIGN.CENTER)
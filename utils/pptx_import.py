@@ -10,9 +10,14 @@ converted to snake_case so that a slide exported with
 ``pptx_export.build_pptx_from_df`` round‑trips cleanly.
 """
 from io import BytesIO
+from itertools import islice
 from typing import IO, Any, Dict, List
 from pptx import Presentation
 from pptx.enum.shapes import MSO_SHAPE_TYPE
+# PUBLIC EXPORT
+__all__ = ["read_concept_cards"]
+
+_KEY_XLATE = str.maketrans({" ": "_"})   # "Field Name" → "field_name"
 
 def read_concept_cards(stream: IO[bytes]) -> List[Dict[str, Any]]:
     """Return a list of concept dicts (including any slide pictures) extracted from a PPTX file."""
@@ -26,10 +31,18 @@ def read_concept_cards(stream: IO[bytes]) -> List[Dict[str, Any]]:
         if slide.shapes.title:
             card["title"] = slide.shapes.title.text.strip()
 
-        # images: extract each picture shape as a BytesIO with a `.name` and extension
+        # one pass over the shapes: every picture, plus the first table
         media_files: List[BytesIO] = []
+        table_found = False
         for shape in slide.shapes:
-            if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
+            if not table_found and getattr(shape, "has_table", False):
+                for row in islice(shape.table.rows, 1, None):  # skip header
+                    key = row.cells[0].text.strip().lower().translate(_KEY_XLATE)
+                    val = row.cells[1].text.strip()
+                    card[key] = val
+                table_found = True
+            elif shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
+                # extract as a BytesIO with a `.name` and extension
                 img = shape.image
                 ext = img.ext  # e.g. ‘png’, ‘jpg’
                 bio = BytesIO(img.blob)
@@ -38,18 +51,6 @@ def read_concept_cards(stream: IO[bytes]) -> List[Dict[str, Any]]:
         if media_files:
             card["media"] = media_files
 
-        # first table (if any)
-        for shape in slide.shapes:
-            if not getattr(shape, "has_table", False):
-                continue
-            tbl = shape.table
-            rows = list(tbl.rows)[1:]  # skip header
-            for row in rows:
-                key = row.cells[0].text.strip().lower().replace(" ", "_")
-                val = row.cells[1].text.strip()
-                card[key] = val
-            break
-
         cards.append(card)
 
     return cards
\ No newline at end of file
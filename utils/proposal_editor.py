@@ -4,13 +4,19 @@ from __future__ import annotations
 import streamlit as st
 import json
 import re
+from functools import lru_cache
 from typing import Any, Dict, Callable
-from streamlit_quill import st_quill
-import html2text
 
-# Converter for rich-text fields
-h2t = html2text.HTML2Text()
-h2t.ignore_links = False
+_SAFE_KEY = re.compile(r'[^A-Za-z0-9_]')   # widget-key sanitiser
+
+
+@lru_cache(maxsize=1)
+def _get_h2t():
+    """Converter for rich-text fields (html2text is only imported on first use)."""
+    import html2text
+    h2t = html2text.HTML2Text()
+    h2t.ignore_links = False
+    return h2t
 
 __all__ = ["ProposalEditor"]
 
@@ -51,9 +57,6 @@ class ProposalEditor:
         st.markdown(HIGHLIGHT_CSS, unsafe_allow_html=True)
         st.header("📝 Interactive Proposal Editor")
 
-        # Snapshot for diffing
-        prev = json.loads(json.dumps(drafts))
-        st.session_state["_previous_draft"] = prev
         flash = set(st.session_state.get("flash_sections", []))
         last_diff = st.session_state.get("last_diff")
         if last_diff:
@@ -62,7 +65,7 @@ class ProposalEditor:
 
         dirty = False
         for title, draft in drafts.items():
-            safe_title = re.sub(r'[^A-Za-z0-9_]', "_", title)
+            safe_title = _SAFE_KEY.sub("_", title)
             with st.expander(title, expanded=False):
                 # Preview button
                 if st.button("👁 Preview this draft", key=f"preview_{safe_title}"):
@@ -88,18 +91,21 @@ class ProposalEditor:
                         st.markdown(f"**{label}**")
 
                     # Unique widget key
-                    safe_field = re.sub(r'[^A-Za-z0-9_]', "_", field)
+                    safe_field = _SAFE_KEY.sub("_", field)
                     widget_key = f"{safe_title}__{safe_field}"
 
                     # Render appropriate widget
                     new_val = self._widget_for(widget_key, val)
                     if new_val != val:
+                        # Keep each field's pre-edit value – regeneration diffs against it
+                        pending = st.session_state.setdefault("_pending_diff", {})
+                        pending.setdefault((title, field), val)
                         draft[field] = new_val
                         dirty = True
 
                     # Regenerate button for this field
                     if st.button("↻ Regenerate", key=f"{widget_key}__regen"):
-                        st.session_state["_regen_payload"] = {"draft": draft, "field": field}
+                        st.session_state["_regen_payload"] = {"draft": draft, "field": field, "title": title}
                         st.rerun()
 
                     st.markdown("---")
@@ -146,7 +152,8 @@ class ProposalEditor:
         # String
         if isinstance(value, str):
             if "\n" in value or len(value) > 120 or '<' in value:
-                html = h2t.handle(value) if '<' in value else value
+                from streamlit_quill import st_quill
+                html = _get_h2t().handle(value) if '<' in value else value
                 return st_quill(html, key=widget_key)
             return st.text_input("", value=value, key=widget_key, label_visibility="collapsed")
 
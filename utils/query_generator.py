@@ -1,7 +1,13 @@
 # utils/query_generator.py
 
 from utils.llm import call_llm
+from diskcache import Cache
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Dict
+import hashlib
 import os
+import threading
 
 # Load Azure OpenAI credentials
 AZURE_OPENAI_ENDPOINT    = "https://harsh-m6qoycs6-eastus2.cognitiveservices.azure.com"
@@ -9,7 +15,51 @@ AZURE_OPENAI_DEPLOYMENT  = "gpt-4o"
 AZURE_OPENAI_API_VERSION = "2025-01-01-preview"
 AZURE_OPENAI_API_KEY     = "DjlhGHwAzeElpQGkUTYRSlZ1s7R3mlxyviIUQODK8kGcxzmrmiryJQQJ99BBACHYHv6XJ3w3AAAAACOGIyMt"
 
+# Repeated TRL runs ask for the same concepts → remember the shortened query
+QUERY_CACHE_DIR = ".cache/query_generator"
+QUERY_CACHE_TTL = 7 * 24 * 3600     # seconds
+
+_query_cache = Cache(QUERY_CACHE_DIR)
+# cache key → Future of the LLM call in progress, so concurrent misses share it
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
 def generate_academic_search_query(concept_description: str, max_keywords: int = 8) -> str:
+    """Cached front for :func:`_generate_query` (memory, then disk, then LLM)."""
+    # whitespace-only differences should not miss the cache
+    return _cached_query(" ".join(concept_description.split()), max_keywords)
+
+
+@lru_cache(maxsize=4096)
+def _cached_query(text: str, max_keywords: int) -> str:
+    key = f"{max_keywords}:{hashlib.sha256(text.lower().encode('utf-8')).hexdigest()}"
+    hit = _query_cache.get(key)
+    if hit is not None:
+        return hit
+
+    with _inflight_lock:
+        fut = _inflight.get(key)
+        owner = fut is None
+        if owner:
+            fut = _inflight[key] = Future()
+    if not owner:
+        return fut.result()
+
+    try:
+        query = _generate_query(text, max_keywords)
+        _query_cache.set(key, query, expire=QUERY_CACHE_TTL)
+        fut.set_result(query)
+        return query
+    except BaseException as e:
+        fut.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def _generate_query(concept_description: str, max_keywords: int = 8) -> str:
     '''
     Use the LLM to turn a long concept_description into a short, keyword-dense
     query for arXiv/CrossRef. The output should be ≤ max_keywords words.
@@ -0,0 +1,106 @@
+"""Semantic response cache for repeatable agent calls.
+
+Usage:
+────────────────────────────────────────────────────────────────────────────
+from utils import response_cache
+
+out = response_cache.get(text, "Proposal Writer Agent")
+if out is None:
+    out = agent.act(text)
+    response_cache.put(text, "Proposal Writer Agent", out)
+
+Exact repeats are answered from a SHA-256 key without touching the network;
+otherwise *text* is embedded and the closest stored entry for the same
+*agent* is returned when its cosine similarity clears ``HIT_THRESHOLD``.
+*agent* is just a namespace – callers whose answers must never cross
+records (e.g. one proposal per concept) add a per-record suffix to it.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from diskcache import Cache
+
+from utils.embedding import embed_texts
+
+CACHE_DIR     = ".cache/agent_responses"
+CACHE_TTL     = 7 * 24 * 3600     # seconds
+HIT_THRESHOLD = 0.97              # cosine – near-identical inputs only
+
+_store = Cache(CACHE_DIR)
+# agent → (disk keys, unit-vector matrix) – loaded from disk in one pass
+_index: Dict[str, Tuple[List[str], np.ndarray]] = {}
+_loaded = False
+_lock = threading.Lock()
+_EMPTY = np.empty((0, 0), dtype=np.float32)
+
+
+def _key(text: str, agent: str) -> str:
+    return f"{agent}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+
+def _vectors(agent: str) -> Tuple[List[str], np.ndarray]:
+    """Return the in-memory index for *agent* (call with ``_lock`` held).
+
+    The first call indexes every namespace in a single scan of the store,
+    so many small per-record namespaces cost no extra disk passes.
+    """
+    global _loaded
+    if not _loaded:
+        groups: Dict[str, Tuple[List[str], list]] = {}
+        for k in _store.iterkeys():
+            if isinstance(k, str):
+                entry = _store.get(k)
+                if entry is not None:
+                    keys, vecs = groups.setdefault(k.rpartition(":")[0], ([], []))
+                    keys.append(k)
+                    vecs.append(entry[0])
+        for ns, (keys, vecs) in groups.items():
+            _index[ns] = (keys, np.stack(vecs))
+        _loaded = True
+    return _index.get(agent, ([], _EMPTY))
+
+
+def get(key_text: str, agent: str) -> Any | None:
+    """Cached response for *key_text* under *agent*, or ``None`` on a miss."""
+    entry = _store.get(_key(key_text, agent))
+    if entry is not None:
+        return entry[1]
+
+    with _lock:
+        keys, mat = _vectors(agent)
+    if not keys:
+        return None
+    try:
+        q = embed_texts([key_text])[0]
+    except Exception as e:
+        logging.warning("response_cache: embedding failed, treating as miss – %s", e)
+        return None
+
+    sims = mat @ q
+    best = int(np.argmax(sims))
+    if sims[best] < HIT_THRESHOLD:
+        return None
+    entry = _store.get(keys[best])       # may have expired since indexing
+    return None if entry is None else entry[1]
+
+
+def put(key_text: str, agent: str, value: Any) -> None:
+    """Store *value* as the response to *key_text* under *agent*."""
+    try:
+        vec = embed_texts([key_text])[0]
+    except Exception as e:
+        logging.warning("response_cache: embedding failed, not caching – %s", e)
+        return
+
+    key = _key(key_text, agent)
+    _store.set(key, (vec, value), expire=CACHE_TTL)
+    with _lock:
+        keys, mat = _vectors(agent)
+        if key in keys:
+            return
+        _index[agent] = (keys + [key], np.vstack([mat, vec]) if keys else vec[None, :])
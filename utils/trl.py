@@ -1,8 +1,10 @@
 """Helper functions for TRL assessments."""
+from functools import cache
 from pathlib import Path
 
 RUBRIC_PATH = Path(__file__).resolve().parent.parent / "trl_rubric.md"
 
+@cache
 def load_trl_rubric() -> str:
-    """Return the NASA TRL rubric text."""
+    """Return the NASA TRL rubric text (read once per process)."""
     return RUBRIC_PATH.read_text(encoding="utf-8")
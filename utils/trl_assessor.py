@@ -3,17 +3,21 @@ from __future__ import annotations
 
 import asyncio
 import textwrap
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Tuple, List, Dict
 
 from utils.evidence import gather_evidence, sanitize_snippet
 from utils.trl import load_trl_rubric
-from utils.llm import call_llm_with_schema
+from utils.llm import call_llm_with_schema_async
 from schemas import AGENT_JSON_SCHEMAS
 from config import AZURE_ENDPOINT, AZURE_OPENAI_KEY
 
 # Use a small deployment by default
 DEPLOYMENT = "ccm-ric-o3"
 VERSION = "2025-01-01-preview"
+TRL_WORKERS = 32            # concurrent assessments in assess_trl_batch
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=TRL_WORKERS, thread_name_prefix="trl")
 
 async def assess_trl_async(topic: str) -> Tuple[Dict, List[Dict]]:
     rubric = load_trl_rubric()
@@ -57,7 +61,8 @@ async def assess_trl_async(topic: str) -> Tuple[Dict, List[Dict]]:
         """
     )
 
-    result = call_llm_with_schema(
+    # off-loop so concurrent assessments overlap their round-trips
+    result = await call_llm_with_schema_async(
         AZURE_ENDPOINT,
         DEPLOYMENT,
         VERSION,
@@ -71,3 +76,26 @@ async def assess_trl_async(topic: str) -> Tuple[Dict, List[Dict]]:
 
 def assess_trl(topic: str) -> Tuple[Dict, List[Dict]]:
     return asyncio.run(assess_trl_async(topic))
+
+
+def _outcome(f: Future):
+    try:
+        return f.result()
+    except Exception as e:
+        return e
+
+
+def assess_trl_batch(
+    topics: List[str], return_exceptions: bool = False
+) -> List[Tuple[Dict, List[Dict]]]:
+    """Assess many *topics* concurrently; results keep the input order.
+
+    With *return_exceptions*, a failed topic yields its exception instead
+    of aborting the whole batch (as in ``asyncio.gather``).
+    """
+    # submit everything before collecting – waiting inside the submit loop
+    # would serialise the round-trips again
+    futures = [_EXECUTOR.submit(assess_trl, t) for t in topics]
+    if return_exceptions:
+        return [_outcome(f) for f in futures]
+    return [f.result() for f in futures]